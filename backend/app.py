@@ -1,94 +1,362 @@
-from flask import Flask, request, jsonify, send_from_directory, session
+from flask import Flask, Response, request, jsonify, send_from_directory, session, stream_with_context, url_for
 from flask_cors import CORS
+from werkzeug.serving import is_running_from_reloader
+from werkzeug.middleware.proxy_fix import ProxyFix
+from main import analyze_resume_and_job, chat_with_ai, stream_analysis, stream_chat, extract_resume_info, job_posting_with_title, check_resume_size, ResumeTooLarge, daily_limit
+from pipeline import load_inputs, parse_in_process, run_batch, unique_links, StageTimeout, BATCH_MAX_JOBS
+from rate_limit import RateLimitExceeded
+from scoring import score_resume
+from normalize import token_savings
+from metrics import registry
+from sessions import session_store
+from jobs import analysis_jobs, analysis_workers, QueueFull
+import math
+import json
+import time
 import os
-from werkzeug.utils import secure_filename
-from main import job_posting, extract_resume_info, analyze_resume_and_job, chat_with_ai
 
 app = Flask(__name__, static_folder="../frontend/build", static_url_path="/")
 app.secret_key = 'resume-recommender-secret-key'
 CORS(app, origins="*", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
-UPLOAD_FOLDER = 'temp_uploads'
-ALLOWED_EXTENSIONS = {'pdf'}
+# Number of reverse proxies in front of the app, so per-client quotas see the real client IP.
+if int(os.getenv("PROXY_COUNT", "0")):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv("PROXY_COUNT")))
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+ALLOWED_EXTENSIONS = {'pdf'}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
+# Seconds between job store reads while streaming a job's status.
+JOB_STREAM_POLL = float(os.getenv("JOB_STREAM_POLL", "0.5"))
+
+# Job workers are started by the entrypoints (and on the first enqueue), never
+# on import: resume parse processes and the reloader's parent import this file too.
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def client_id():
+    return request.remote_addr
+
+def rate_limited(e):
+    retry_after = math.ceil(min(e.retry_after, 24 * 3600))
+    response = jsonify({'error': str(e), 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def cache_bypassed():
+    return request.form.get('no_cache', '').lower() in ('1', 'true', 'yes')
+
+def async_requested():
+    return (request.form.get('async', '').lower() in ('1', 'true', 'yes')
+            or 'respond-async' in request.headers.get('Prefer', ''))
+
+def validate_resume_upload():
+    if 'resume' not in request.files:
+        return 'No resume file provided'
+    resume_file = request.files['resume']
+    if resume_file.filename == '':
+        return 'No file selected'
+    if not allowed_file(resume_file.filename):
+        return 'Only PDF files are allowed'
+    return None
+
+def validate_analyze_request():
+    error = validate_resume_upload()
+    if error:
+        return error
+    if not request.form.get('job_link'):
+        return 'No job link provided'
+    return None
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(chunks, first_event=None, on_complete=None):
+    def events():
+        try:
+            if first_event:
+                yield sse_event(*first_event)
+            parts = []
+            for chunk in chunks:
+                parts.append(chunk)
+                yield sse_event('token', {'text': chunk})
+            if on_complete:
+                on_complete(''.join(parts))
+            yield sse_event('done', {})
+        except Exception as e:
+            print(f"Error while streaming: {str(e)}")
+            yield sse_event('error', {'error': str(e)})
+        finally:
+            # Runs on client disconnect too, which stops the upstream generation.
+            chunks.close()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def enqueue_analysis():
+    try:
+        priority = max(-10, min(int(request.form.get('priority', 0)), 10))
+    except ValueError:
+        return jsonify({'error': 'priority must be an integer'}), 400
+
+    pdf_bytes = request.files['resume'].read()
+    check_resume_size(pdf_bytes)
+    job_id = analysis_jobs.enqueue({'job_link': request.form['job_link'], 'use_cache': not cache_bypassed(),
+                                    'client_id': client_id()}, pdf_bytes, priority)
+    analysis_workers.start()
+    analysis_workers.notify()
+
+    status_url = url_for('analysis_job_status', job_id=job_id)
+    response = jsonify({'job_id': job_id, 'status': 'queued', 'status_url': status_url})
+    response.status_code = 202
+    response.headers['Location'] = status_url
+    return response
+
+def job_response(job):
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'priority': job['priority'],
+        'attempts': job['attempts'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    }
+
 @app.route('/')
 def root():
     return send_from_directory(app.static_folder, "index.html")
 
 @app.route('/api/health')
 def health_check():
-    return jsonify({'status': 'healthy'})
+    return jsonify({'status': 'healthy', 'rate_limit': daily_limit.utilization(),
+                    'tokens_saved': dict(token_savings), 'jobs': analysis_jobs.counts()})
+
+@app.route('/api/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_resume():
     try:
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No resume file provided'}), 400
-        
-        resume_file = request.files['resume']
-        if resume_file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(resume_file.filename):
-            return jsonify({'error': 'Only PDF files are allowed'}), 400
-        
-        job_link = request.form.get('job_link')
-        if not job_link:
-            return jsonify({'error': 'No job link provided'}), 400
-        
-        filename = secure_filename(resume_file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        resume_file.save(temp_path)
+        error = validate_analyze_request()
+        if error:
+            return jsonify({'error': error}), 400
+        if async_requested():
+            return enqueue_analysis()
         
-        try:
-            resume_info = extract_resume_info(temp_path)
-            job_info = job_posting(job_link)            
-            analysis_result = analyze_resume_and_job(resume_info, job_info)
-                
-            if analysis_result['success']:
-                ai_response = analysis_result['analysis']
-                return jsonify({
-                    'status': 'success',
-                    'message': ai_response,
-                    'resume_content': resume_info,
-                    'job_content': job_info
-                })
-            else:
-                print(f"Analysis failed: {analysis_result['error']}")
-                return jsonify({
-                    'error': analysis_result['error']
-                }), 500
+        resume_info, job_info = load_inputs(request.files['resume'].read(), request.form['job_link'])
+        analysis_result = analyze_resume_and_job(resume_info, job_info, use_cache=not cache_bypassed(),
+                                                 client_id=client_id())
             
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        if analysis_result['success']:
+            ai_response = analysis_result['analysis']
+            session_id = session_store.create(resume_info, job_info, ai_response)
+            return jsonify({
+                'status': 'success',
+                'message': ai_response,
+                'cached': analysis_result['cached'],
+                'session_id': session_id
+            })
+        else:
+            print(f"Analysis failed: {analysis_result['error']}")
+            return jsonify({
+                'error': analysis_result['error']
+            }), 500
                 
+    except ResumeTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except RateLimitExceeded as e:
+        return rate_limited(e)
+    except StageTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print(f"Error in analyze_resume: {str(e)}")
         return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/<job_id>')
+def analysis_job_status(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job_response(job))
+
+@app.route('/api/analyze/<job_id>/stream')
+def analysis_job_stream(job_id):
+    if analysis_jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+
+    def events():
+        last_status = None
+        last_event = time.monotonic()
+        while True:
+            job = analysis_jobs.get(job_id)
+            if job is None:
+                yield sse_event('error', {'error': 'Job not found or expired'})
+                return
+            if job['status'] != last_status:
+                last_status = job['status']
+                last_event = time.monotonic()
+                yield sse_event('status', job_response(job))
+            if job['status'] == 'done':
+                yield sse_event('done', {})
+                return
+            if job['status'] == 'failed':
+                yield sse_event('error', {'error': job['error']})
+                return
+            if time.monotonic() - last_event > 15:
+                # Keeps proxies from closing an idle connection.
+                last_event = time.monotonic()
+                yield ": keepalive\n\n"
+            time.sleep(JOB_STREAM_POLL)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_resume_stream():
+    try:
+        error = validate_analyze_request()
+        if error:
+            return jsonify({'error': error}), 400
+
+        resume_info, job_info = load_inputs(request.files['resume'].read(), request.form['job_link'])
+        chunks = stream_analysis(resume_info, job_info, use_cache=not cache_bypassed(), client_id=client_id())
+        session_id = session_store.create(resume_info, job_info)
+    except ResumeTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except RateLimitExceeded as e:
+        return rate_limited(e)
+    except StageTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        print(f"Error in analyze_resume_stream: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return sse_response(chunks, ('session', {'session_id': session_id}),
+                        lambda analysis: session_store.update(session_id, analysis=analysis))
     
+@app.route('/api/score', methods=['POST'])
+def score():
+    try:
+        error = validate_analyze_request()
+        if error:
+            return jsonify({'error': error}), 400
+
+        resume_info, (job_info, title) = load_inputs(request.files['resume'].read(), request.form['job_link'],
+                                                     fetch=job_posting_with_title)
+        return jsonify(dict(score_resume(resume_info, job_info, title), status='success'))
+    except ResumeTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except StageTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        print(f"Error in score: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_resume_batch():
+    error = validate_resume_upload()
+    if error:
+        return jsonify({'error': error}), 400
+
+    job_links = []
+    for value in request.form.getlist('job_links'):
+        job_links.extend(value.splitlines())
+    job_links = unique_links(job_links)
+    if not job_links:
+        return jsonify({'error': 'No job links provided'}), 400
+    if len(job_links) > BATCH_MAX_JOBS:
+        return jsonify({'error': f'At most {BATCH_MAX_JOBS} job links can be analyzed at once'}), 400
+
+    try:
+        resume_info = extract_resume_info(request.files['resume'].read(), parser=parse_in_process)
+    except ResumeTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except StageTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        print(f"Error in analyze_resume_batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    use_cache = not cache_bypassed()
+    client = client_id()
+    top_k = request.form.get('top_k', type=int)
+    postings = {}
+
+    def analyze(job_link):
+        job_info, title = postings.get(job_link) or job_posting_with_title(job_link)
+        analysis_result = analyze_resume_and_job(resume_info, job_info, use_cache=use_cache, client_id=client)
+        return {
+            'status': 'success',
+            'message': analysis_result['analysis'],
+            'cached': analysis_result['cached'],
+            'match': score_resume(resume_info, job_info, title),
+            'session_id': session_store.create(resume_info, job_info, analysis_result['analysis'])
+        }
+
+    def failure(job_link, e):
+        if isinstance(e, RateLimitExceeded):
+            return {'status': 'error', 'error': str(e), 'retry_after': math.ceil(min(e.retry_after, 24 * 3600))}
+        print(f"Batch analysis failed for {job_link}: {str(e)}")
+        return {'status': 'error', 'error': str(e)}
+
+    def results():
+        succeeded = failed = 0
+        to_analyze = job_links
+        if top_k is not None:
+            # Rank every posting locally and only spend Gemini calls on the best matches.
+            matches = {}
+            for job_link, future in run_batch(job_links, job_posting_with_title):
+                try:
+                    postings[job_link] = future.result()
+                    matches[job_link] = score_resume(resume_info, *postings[job_link])
+                except Exception as e:
+                    failed += 1
+                    yield json.dumps(dict(failure(job_link, e), job_link=job_link)) + '\n'
+            ranked = sorted(matches, key=lambda link: -matches[link]['score'])
+            to_analyze = ranked[:max(top_k, 0)]
+            for job_link in ranked[len(to_analyze):]:
+                succeeded += 1
+                yield json.dumps({'status': 'scored', 'match': matches[job_link], 'job_link': job_link}) + '\n'
+
+        for job_link, future in run_batch(to_analyze, analyze):
+            try:
+                result = future.result()
+                succeeded += 1
+            except Exception as e:
+                failed += 1
+                result = failure(job_link, e)
+            yield json.dumps(dict(result, job_link=job_link)) + '\n'
+        yield json.dumps({'status': 'done', 'succeeded': succeeded, 'failed': failed}) + '\n'
+
+    return Response(stream_with_context(results()), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     data = request.get_json()
     message = data.get('message', '')
-    resume_content = data.get('resume_content', '')
-    job_content = data.get('job_content', '')
+    session_id = data.get('session_id')
+    chat_session = session_store.get(session_id)
     
-    if not resume_content or not job_content:
-        return jsonify({'error': 'Missing resume or job data. Please analyze a resume first.'}), 400
+    if chat_session is None:
+        return jsonify({'error': 'Session not found or expired. Please analyze a resume first.'}), 404
     
-    chat_result = chat_with_ai(resume_content, message, None, job_content)
+    try:
+        chat_result = chat_with_ai(chat_session['resume_info'], message, chat_session['analysis'],
+                                   chat_session['job_info'], chat_session['history'], client_id())
+    except RateLimitExceeded as e:
+        return rate_limited(e)
     
     if chat_result['success']:
+        session_store.update(session_id, turn={'user': message, 'assistant': chat_result['response']})
         response = {
             'id': str(len(message) + 1),
             'text': chat_result['response'],
@@ -99,5 +367,31 @@ def chat():
     else:
         return jsonify({'error': chat_result['error']}), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    data = request.get_json()
+    message = data.get('message', '')
+    session_id = data.get('session_id')
+    chat_session = session_store.get(session_id)
+
+    if chat_session is None:
+        return jsonify({'error': 'Session not found or expired. Please analyze a resume first.'}), 404
+
+    try:
+        chunks = stream_chat(chat_session['resume_info'], message, chat_session['analysis'],
+                             chat_session['job_info'], chat_session['history'], client_id())
+    except RateLimitExceeded as e:
+        return rate_limited(e)
+    except Exception as e:
+        print(f"Error in chat_stream: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return sse_response(chunks, on_complete=lambda text: session_store.update(
+        session_id, turn={'user': message, 'assistant': text}))
+
 if __name__ == '__main__':
+    # With debug=True this block also runs in the reloader's watcher process,
+    # which must not claim jobs.
+    if is_running_from_reloader():
+        analysis_workers.start()
     app.run(debug=True, host='0.0.0.0', port=3050)
\ No newline at end of file
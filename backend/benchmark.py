@@ -0,0 +1,203 @@
+"""Offline load test for the analyze and chat endpoints.
+
+Serves the recorded postings in bench_data/ from a local HTTP server, renders
+the sample resumes to PDFs and swaps the Gemini model for a stub with a fixed
+latency, so the numbers reflect our own pipeline rather than the network.
+
+    python benchmark.py --requests 200 --concurrency 8 --llm-latency 0.5
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+import tempfile
+import argparse
+import itertools
+import threading
+import json
+import time
+import io
+import os
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from metrics import stage_seconds
+from cache import LRUCache
+import numpy as np
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data")
+
+STUB_ANALYSIS = """**Match score: 72/100**
+
+Strengths: relevant Python and SQL experience, quantified results.
+Gaps: no Kubernetes in production, limited leadership examples.
+Suggestions: move the skills section up and mirror the posting's wording."""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_postings():
+    handler = partial(QuietHandler, directory=os.path.join(BENCH_DIR, "postings"))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    links = [base + name for name in sorted(os.listdir(os.path.join(BENCH_DIR, "postings")))]
+    return httpd, links
+
+
+def render_pdf(lines):
+    # Minimal single-page PDF with one text line per row; enough for pypdf.
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    content = "BT /F1 10 Tf 54 750 Td 13 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+               "/Resources << /Font << /F1 5 0 R >> >> >>",
+               f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    return out.encode("latin-1")
+
+
+def load_resumes():
+    folder = os.path.join(BENCH_DIR, "resumes")
+    resumes = []
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name)) as f:
+            resumes.append(render_pdf(f.read().splitlines()))
+    return resumes
+
+
+def stub_llm(latency):
+    def respond(prompt):
+        time.sleep(latency)
+        return AIMessage(content=STUB_ANALYSIS)
+    return RunnableLambda(respond)
+
+
+def configure(args):
+    # Set here and the app imported here, not at module level: resume parsing
+    # processes re-import this script and should not build a second app.
+    # load_dotenv does not override these.
+    tmp = tempfile.mkdtemp(prefix="resume-bench-")
+    os.environ.setdefault("GOOGLE_API_KEY", "offline")
+    os.environ.update({
+        "LANGSMITH_API_KEY": "",
+        "EMBEDDING_PROVIDER": "local",
+        "LLM_CACHE_DB": "",
+        "SESSION_BACKEND": "memory",
+        "JOB_CACHE_DIR": "",
+        "RATE_LIMIT_DB": os.path.join(tmp, "rate_limit.db"),
+        "JOB_DB": os.path.join(tmp, "jobs.db"),
+        "RATE_LIMIT_PER_SECOND": str(10 ** 9),
+        "RATE_LIMIT_BURST": str(10 ** 9),
+        "RATE_LIMIT_PER_DAY": str(10 ** 9),
+        "RATE_LIMIT_PER_CLIENT_DAY": "0",
+    })
+    import main
+    import app as server
+    main.llm = stub_llm(args.llm_latency)
+    if args.cold:
+        # Every request pays for parsing and fetching, as on a fresh worker.
+        main.resume_cache.max_entries = 0
+        main.job_fetcher.memory = LRUCache(0)
+        main.job_fetcher.disk = None
+    return server.app
+
+
+def analyze_request(client, resume, link, use_cache):
+    data = {"resume": (io.BytesIO(resume), "resume.pdf"), "job_link": link}
+    if not use_cache:
+        data["no_cache"] = "true"
+    return client.post("/api/analyze", data=data, content_type="multipart/form-data")
+
+
+def run(args):
+    httpd, links = serve_postings()
+    resumes = load_resumes()
+    client = configure(args).test_client()
+    pairs = itertools.cycle([(resume, link) for resume in resumes for link in links])
+
+    sessions = []
+    if args.endpoint == "chat":
+        for resume, link in itertools.islice(pairs, args.concurrency):
+            response = analyze_request(client, resume, link, args.llm_cache)
+            sessions.append(response.get_json()["session_id"])
+        sessions = itertools.cycle(sessions)
+
+    lock = threading.Lock()
+
+    def one_request(_):
+        with lock:
+            resume, link = next(pairs)
+            session_id = next(sessions) if args.endpoint == "chat" else None
+        start = time.perf_counter()
+        if session_id:
+            response = client.post("/api/chat", json={"session_id": session_id,
+                                                       "message": "Which skills should I add?"})
+        else:
+            response = analyze_request(client, resume, link, args.llm_cache)
+        return time.perf_counter() - start, response.status_code
+
+    stage_seconds.series.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    httpd.shutdown()
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(1 for _, status in results if status != 200)
+    stages = {dict(key)["stage"]: round(total / sum(counts) * 1000, 2)
+              for key, (counts, total) in stage_seconds.series.items()}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "endpoint": args.endpoint,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency * 1000,
+        "cold": args.cold,
+        "errors": errors,
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "latency_ms": {"p50": round(p50, 2), "p95": round(p95, 2), "p99": round(p99, 2),
+                       "max": round(latencies.max(), 2)},
+        "stage_mean_ms": dict(sorted(stages.items())),
+    }
+
+
+def print_report(report):
+    print(f"{report['endpoint']}: {report['requests']} requests, concurrency {report['concurrency']}, "
+          f"stub LLM {report['llm_latency_ms']:.0f} ms{', cold caches' if report['cold'] else ''}")
+    print(f"  throughput  {report['throughput_rps']} req/s, errors {report['errors']}")
+    print("  latency     " + "  ".join(f"{name} {value} ms" for name, value in report["latency_ms"].items()))
+    for stage, mean in report["stage_mean_ms"].items():
+        print(f"  {stage:<22} mean {mean} ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", choices=["analyze", "chat"], default="analyze")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub model latency in seconds")
+    parser.add_argument("--llm-cache", action="store_true", help="allow analysis cache hits")
+    parser.add_argument("--cold", action="store_true", help="disable resume and job posting caches")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,196 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from metrics import cache_requests
+from cache import LRUCache
+import requests
+import threading
+import hashlib
+import json
+import time
+import os
+
+load_dotenv()
+
+TRACKING_PARAMS = {"gh_src", "fbclid", "gclid", "mc_cid", "mc_eid", "_hsenc", "_hsmi"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+
+def normalize_url(link):
+    parts = urlsplit(link.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS]
+    query.sort()
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class DiskCache:
+    # Files older than max_age are ignored and swept out every prune_interval,
+    # so postings nobody asks for again don't pile up.
+    def __init__(self, directory, max_age=7 * 24 * 3600, prune_interval=3600):
+        self.directory = directory
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self.next_prune = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, entry):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._maybe_prune()
+
+    def _maybe_prune(self):
+        with self.lock:
+            now = time.time()
+            if now < self.next_prune:
+                return
+            self.next_prune = now + self.prune_interval
+        self.prune()
+
+    def prune(self):
+        cutoff = time.time() - self.max_age
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                # Another process pruned or rewrote it first.
+                pass
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class JobPostingFetcher:
+    def __init__(self, max_entries=256, ttl=3600, cache_dir=None, per_host=4, pool_size=32, timeout=15,
+                 max_age=7 * 24 * 3600):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.per_host = per_host
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(cache_dir, max_age) if cache_dir else None
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.lock = threading.Lock()
+        self.host_limits = {}
+        self.in_flight = {}
+
+    def fetch(self, link):
+        # The normalized URL is only the cache key; requests go to the link as
+        # given, since some boards treat "?jobid" and "?jobid=" differently.
+        key = normalize_url(link)
+        entry = self._cached(key)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            cache_requests.inc(cache="job_posting", result="hit")
+            return entry["text"]
+        cache_requests.inc(cache="job_posting", result="stale" if entry else "miss")
+
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = _InFlight()
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._load(key, link.strip(), entry)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call.done.set()
+
+    def _cached(self, key):
+        entry = self.memory.get(key)
+        if entry is None and self.disk:
+            entry = self.disk.get(key)
+            if entry:
+                self.memory.set(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        self.memory.set(key, entry)
+        if self.disk:
+            self.disk.set(key, entry)
+
+    def _host_limit(self, key):
+        host = urlsplit(key).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_limits[host]
+
+    def _load(self, key, link, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self._host_limit(key):
+            response = self.session.get(link, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry:
+            entry = dict(entry, fetched_at=time.time())
+            self._store(key, entry)
+            return entry["text"]
+
+        response.raise_for_status()
+        entry = {
+            "url": link,
+            "text": response.text,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._store(key, entry)
+        return entry["text"]
+
+
+job_fetcher = JobPostingFetcher(
+    max_entries=int(os.getenv("JOB_CACHE_SIZE", "256")),
+    ttl=int(os.getenv("JOB_CACHE_TTL", "3600")),
+    cache_dir=os.getenv("JOB_CACHE_DIR"),
+    per_host=int(os.getenv("JOB_FETCH_PER_HOST", "4")),
+    max_age=int(os.getenv("JOB_CACHE_MAX_AGE", str(7 * 24 * 3600))),
+)
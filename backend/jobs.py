@@ -0,0 +1,238 @@
+from dotenv import load_dotenv
+from contextlib import contextmanager
+from main import analyze_resume_and_job
+from pipeline import load_inputs, StageTimeout
+from rate_limit import RateLimitExceeded
+from sessions import session_store
+from metrics import registry, Gauge
+import threading
+import requests
+import secrets
+import sqlite3
+import json
+import time
+import os
+
+load_dotenv()
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "5"))
+# Rate-limit waits longer than this (e.g. the daily quota) fail the job instead.
+JOB_MAX_RETRY_DELAY = float(os.getenv("JOB_MAX_RETRY_DELAY", "300"))
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobStore:
+    # Jobs live in SQLite so they survive restarts and can be shared by
+    # several web and worker processes. A claimed job is leased; if its worker
+    # dies, the job becomes claimable again once the lease runs out.
+    def __init__(self, path="jobs.db", ttl=3600, lease=600, max_queued=1000):
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.max_queued = max_queued
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS jobs "
+                       "(id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+                       "payload TEXT NOT NULL, data BLOB, attempts INTEGER NOT NULL, result TEXT, error TEXT, "
+                       "created_at REAL NOT NULL, updated_at REAL NOT NULL, run_after REAL NOT NULL, "
+                       "lease_until REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at)")
+
+    @contextmanager
+    def _connect(self, write=True):
+        # Reads use a deferred transaction, which under WAL never waits for
+        # or blocks the workers writing to the queue.
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        try:
+            db.execute("BEGIN IMMEDIATE" if write else "BEGIN DEFERRED")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def enqueue(self, payload, data=None, priority=0):
+        job_id = secrets.token_urlsafe(16)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (now - self.ttl,))
+            queued = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull("Too many analyses are queued, please try again shortly")
+            db.execute("INSERT INTO jobs (id, status, priority, payload, data, attempts, created_at, updated_at, "
+                       "run_after) VALUES (?, 'queued', ?, ?, ?, 0, ?, ?, ?)",
+                       (job_id, priority, json.dumps(payload), data, now, now, now))
+        return job_id
+
+    def claim(self, max_attempts=JOB_MAX_ATTEMPTS):
+        now = time.time()
+        with self._connect() as db:
+            # Jobs whose worker died on the last allowed attempt are not retried.
+            db.execute("UPDATE jobs SET status = 'failed', error = 'Worker stopped while running the job', "
+                       "data = NULL, updated_at = ? WHERE status = 'running' AND lease_until < ? "
+                       "AND attempts >= ?", (now, now, max_attempts))
+            row = db.execute("SELECT id, payload, data, attempts FROM jobs "
+                             "WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_until < ?) "
+                             "ORDER BY priority DESC, created_at LIMIT 1", (now, now)).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, "
+                       "updated_at = ? WHERE id = ?", (now + self.lease, now, row[0]))
+        return {"id": row[0], "payload": json.loads(row[1]), "data": row[2], "attempts": row[3] + 1}
+
+    def complete(self, job_id, result):
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, data = NULL, updated_at = ? "
+                       "WHERE id = ? AND status = 'running'", (json.dumps(result), time.time(), job_id))
+
+    def retry(self, job_id, error, delay):
+        now = time.time()
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ? "
+                       "WHERE id = ? AND status = 'running'", (error, now + delay, now, job_id))
+
+    def fail(self, job_id, error):
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'failed', error = ?, data = NULL, updated_at = ? "
+                       "WHERE id = ? AND status = 'running'", (error, time.time(), job_id))
+
+    def get(self, job_id):
+        with self._connect(write=False) as db:
+            row = db.execute("SELECT id, status, priority, attempts, result, error, created_at, updated_at "
+                             "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(("id", "status", "priority", "attempts", "result", "error", "created_at", "updated_at"), row))
+        if job["status"] in ("done", "failed") and time.time() - job["updated_at"] > self.ttl:
+            return None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self):
+        with self._connect(write=False) as db:
+            rows = db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def is_transient(error):
+    # Walks the cause chain, since SDK errors arrive wrapped by LangChain.
+    while error is not None:
+        if isinstance(error, (StageTimeout, requests.ConnectionError, requests.Timeout, TimeoutError)):
+            return True
+        response = getattr(error, "response", None)
+        if getattr(error, "code", None) in TRANSIENT_STATUS or getattr(response, "status_code", None) in TRANSIENT_STATUS:
+            return True
+        error = error.__cause__
+    return False
+
+
+def retry_delay(error, attempts):
+    if isinstance(error, RateLimitExceeded):
+        return error.retry_after if error.retry_after <= JOB_MAX_RETRY_DELAY else None
+    if is_transient(error):
+        return min(JOB_RETRY_DELAY * 2 ** (attempts - 1), JOB_MAX_RETRY_DELAY)
+    return None
+
+
+class JobWorkerPool:
+    def __init__(self, store, handler, workers=2, max_attempts=JOB_MAX_ATTEMPTS, poll_interval=1.0):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        # Safe to call on every enqueue; only starts the missing threads.
+        with self.lock:
+            for _ in range(self.workers - len(self.threads)):
+                thread = threading.Thread(target=self._run, name=f"analysis-worker-{len(self.threads)}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def notify(self):
+        self.wakeup.set()
+
+    def _run(self):
+        while not self.stopping.is_set():
+            try:
+                job = self.store.claim(self.max_attempts)
+            except sqlite3.Error as e:
+                print(f"Error claiming analysis job: {str(e)}")
+                job = None
+            if job is None:
+                # Other processes may enqueue too, so poll even without a notify.
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                # Recording the outcome failed (e.g. database locked); the job
+                # keeps its lease and is retried once the lease runs out.
+                print(f"Error finishing analysis job {job['id']}: {str(e)}")
+
+    def _process(self, job):
+        try:
+            result = self.handler(job)
+        except Exception as e:
+            delay = retry_delay(e, job["attempts"]) if job["attempts"] < self.max_attempts else None
+            if delay is None:
+                print(f"Analysis job {job['id']} failed: {str(e)}")
+                self.store.fail(job["id"], str(e))
+            else:
+                self.store.retry(job["id"], str(e), delay)
+        else:
+            self.store.complete(job["id"], result)
+
+
+def analyze_job(job):
+    payload = job["payload"]
+    resume_info, job_info = load_inputs(job["data"], payload["job_link"])
+    result = analyze_resume_and_job(resume_info, job_info, use_cache=payload["use_cache"],
+                                    client_id=payload["client_id"])
+    session_id = session_store.create(resume_info, job_info, result["analysis"])
+    return {"message": result["analysis"], "cached": result["cached"], "session_id": session_id}
+
+
+analysis_jobs = JobStore(os.getenv("JOB_DB", "jobs.db"),
+                         ttl=int(os.getenv("JOB_RESULT_TTL", "3600")),
+                         lease=int(os.getenv("JOB_LEASE", "600")),
+                         max_queued=int(os.getenv("JOB_MAX_QUEUED", "1000")))
+analysis_workers = JobWorkerPool(analysis_jobs, analyze_job, ANALYSIS_WORKERS)
+registry.register(Gauge("resume_analysis_jobs", "Analysis jobs in the job store by status",
+                        lambda: [({"status": status}, count) for status, count in analysis_jobs.counts().items()]))
+
+
+if __name__ == "__main__":
+    # Dedicated worker process, for running the web app with ANALYSIS_WORKERS=0.
+    analysis_workers.workers = max(1, ANALYSIS_WORKERS)
+    analysis_workers.start()
+    print(f"Running {analysis_workers.workers} analysis workers on {analysis_jobs.path}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        analysis_workers.stop()
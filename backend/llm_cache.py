@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+from cache import LRUCache
+import hashlib
+import sqlite3
+import json
+import time
+import re
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    return WHITESPACE.sub(" ", text or "").strip()
+
+
+class ResponseCache:
+    def __init__(self, max_entries=512, db_path=None, ttl=7 * 24 * 3600):
+        self.memory = LRUCache(max_entries)
+        self.db_path = db_path
+        self.ttl = ttl
+        if db_path:
+            with self._connect() as db:
+                db.execute("CREATE TABLE IF NOT EXISTS responses "
+                           "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)")
+                db.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def key(self, prompt_version, settings, *inputs):
+        payload = json.dumps([prompt_version, settings, [normalize_text(text) for text in inputs]],
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Hits and misses are counted by the caller (cache_requests in main).
+    def get(self, key):
+        expires_before = time.time() - self.ttl
+        entry = self.memory.get(key)
+        if entry is not None and entry[1] <= expires_before:
+            self.memory.pop(key)
+            entry = None
+        if entry is None and self.db_path:
+            with self._connect() as db:
+                entry = db.execute("SELECT value, created_at FROM responses WHERE key = ? AND created_at > ?",
+                                   (key, expires_before)).fetchone()
+            if entry:
+                self.memory.set(key, entry)
+        return entry[0] if entry else None
+
+    def set(self, key, value):
+        self.memory.set(key, (value, time.time()))
+        if self.db_path:
+            with self._connect() as db:
+                db.execute("DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl,))
+                db.execute("INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                           (key, value, time.time()))
@@ -1,74 +1,128 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.document_loaders import WebBaseLoader
-from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.tracers.langchain import LangChainTracer
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-import threading
-from datetime import datetime
+from fetcher import job_fetcher
+from normalize import normalize_html, normalize_document, estimate_tokens
+from metrics import registry, timed, timed_stream, Gauge, prompt_tokens, cache_requests, rate_limit_wait_seconds, rate_limit_rejections
+from retrieval import Retriever, CachedEmbedder, HashingEmbedder
+from llm_cache import ResponseCache
+from rate_limit import TokenBucketLimiter, RateLimitExceeded
+from cache import LRUCache
+from resume_parser import parse_resume, ResumeTooLarge
+import hashlib
+import random
+import time
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-os.environ["LANGSMITH_TRACING"] = "true"
-os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
+# LangSmith tracing is opt-in per call (see trace_config) rather than global.
+os.environ["LANGSMITH_TRACING"] = "false"
 os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1")) if os.getenv("LANGSMITH_API_KEY") else 0.0
 
-class RateLimiter: 
-    def __init__(self, limit=100):
-        self.limit = limit
-        self.counter = 0
-        self.lock = threading.Lock()
-        self.date = datetime.now().date()
-
-    def check(self):
-        with self.lock:
-            today = datetime.now().date()
-            if today != self.date:
-                self.date = today
-                self.counter = 0
-            if self.counter > self.limit:
-                raise Exception("100 Calls Reached Today")
-            else:
-                self.counter += 1
+# Bump when analysis_prompt changes so cached analyses are not reused.
+ANALYSIS_PROMPT_VERSION = "1"
+
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(5 * 1024 * 1024)))
+JOB_TOKEN_BUDGET = int(os.getenv("JOB_TOKEN_BUDGET", "3000"))
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
 
 class RateLimiterRunnable:
-    def __init__(self, runnable, limiter: RateLimiter):
+    def __init__(self, runnable, limiter: TokenBucketLimiter, client_id=None):
         self.runnable = runnable
         self.limiter = limiter
+        self.client_id = client_id
+    
+    def acquire(self):
+        start = time.perf_counter()
+        try:
+            self.limiter.acquire(self.client_id)
+        except RateLimitExceeded:
+            rate_limit_rejections.inc()
+            raise
+        finally:
+            rate_limit_wait_seconds.observe(time.perf_counter() - start)
     
     def invoke(self, input, config=None, **kwargs):
-        self.limiter.check()
-        return self.runnable.invoke(input, config=config, **kwargs)
+        self.acquire()
+        return self.runnable.invoke(input, config=trace_config(config), **kwargs)
+
+    def stream(self, input, config=None, **kwargs):
+        # Checked eagerly so a rejected call fails before any response is sent.
+        self.acquire()
+        return self.runnable.stream(input, config=trace_config(config), **kwargs)
+
+def trace_config(config=None):
+    if random.random() >= TRACE_SAMPLE_RATE:
+        return config
+    config = dict(config or {})
+    config["callbacks"] = list(config.get("callbacks") or []) + [LangChainTracer()]
+    return config
 
-daily_limit = RateLimiter(limit=100)
+def record_prompt_size(operation, prompt, input):
+    prompt_tokens.observe(estimate_tokens(prompt.format(**input)), operation=operation)
+
+daily_limit = TokenBucketLimiter(db_path=os.getenv("RATE_LIMIT_DB", "rate_limit.db"),
+                                 per_second=float(os.getenv("RATE_LIMIT_PER_SECOND", "1")),
+                                 burst=int(os.getenv("RATE_LIMIT_BURST", "5")),
+                                 per_day=int(os.getenv("RATE_LIMIT_PER_DAY", "100")),
+                                 per_client_day=int(os.getenv("RATE_LIMIT_PER_CLIENT_DAY", "25")),
+                                 max_waiters=int(os.getenv("RATE_LIMIT_MAX_WAITERS", "16")),
+                                 max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", "10")))
+resume_cache = LRUCache(max_entries=int(os.getenv("RESUME_CACHE_SIZE", "128")))
+analysis_cache = ResponseCache(max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+                               db_path=os.getenv("LLM_CACHE_DB", "llm_cache.db") or None,
+                               ttl=int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))))
 
 llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.8)
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+if os.getenv("EMBEDDING_PROVIDER", "google") == "local":
+    embeddings = HashingEmbedder()
+else:
+    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+retriever = Retriever(CachedEmbedder(embeddings), top_k=int(os.getenv("RETRIEVAL_TOP_K", "4")))
+
+registry.register(Gauge("resume_rate_limit_available", "Tokens currently available per rate limit bucket",
+                        lambda: [({"bucket": name}, usage["available"])
+                                 for name, usage in daily_limit.utilization().items() if name != "waiting"]))
+
+@timed("job_posting")
+def job_posting_with_title(link):
+    html = job_fetcher.fetch(link)
+    job_content, report = normalize_html(html, JOB_TOKEN_BUDGET)
+    return job_content, report["title"]
 
 def job_posting(link):
-    loader = WebBaseLoader(link)
-    docs = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    all_splits = text_splitter.split_documents(docs)
-    job_content = "\n".join([doc.page_content for doc in all_splits])
-    return job_content
+    return job_posting_with_title(link)[0]
     
-def extract_resume_info(pdf_path):
-    loader = PyPDFLoader(pdf_path)
-    docs = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    all_splits = text_splitter.split_documents(docs)
-    important_info = []
-    for doc in all_splits:
-        important_info.append(doc.page_content)
-    return "\n".join(important_info)
-
-def analyze_resume_and_job(resume_info, job_info):
-    prompt = ChatPromptTemplate.from_template("""You are an expert resume reviewer and career coach. Your task is to analyze a resume against a specific job posting and provide detailed, actionable feedback.
+def resume_key(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+def check_resume_size(pdf_bytes):
+    if len(pdf_bytes) > MAX_RESUME_BYTES:
+        raise ResumeTooLarge(f"Resume exceeds {MAX_RESUME_BYTES // (1024 * 1024)} MB limit")
+
+@timed("extract_resume_info")
+def extract_resume_info(pdf, parser=None):
+    if isinstance(pdf, str):
+        with open(pdf, "rb") as f:
+            pdf = f.read()
+    check_resume_size(pdf)
+
+    key = resume_key(pdf)
+    cached = resume_cache.get(key)
+    cache_requests.inc(cache="resume", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+
+    resume_info, report = normalize_document((parser or parse_resume)(pdf), RESUME_TOKEN_BUDGET, kind="resume")
+    resume_cache.set(key, resume_info)
+    return resume_info
+
+analysis_prompt = ChatPromptTemplate.from_template("""You are an expert resume reviewer and career coach. Your task is to analyze a resume against a specific job posting and provide detailed, actionable feedback.
 
                                               RESUME CONTENT: {resume_info} 
                                               
@@ -97,25 +151,8 @@ def analyze_resume_and_job(resume_info, job_info):
                                               When returning your result ensure that it is in a format that will be clean and utilized by frontend services. 
                                               The results should still remain accurate but in a better formatted way so that it can be used more seamlessly and look clean from a more user interfact aspect.
                                             """)
-    chain = prompt | llm | StrOutputParser()
-    result = RateLimiterRunnable(chain, daily_limit)
-    input = {"resume_info": resume_info, "job_info": job_info}
-    output = result.invoke(input=input)
-    
-    return {
-        'success': True,
-        'analysis': output,
-        'resume_info': resume_info,
-        'job_info': job_info
-    }
 
-def chat_with_ai(resume, user_message, context=None, job_requirements=None):
-    if not resume or not job_requirements:
-        return {
-            'success': False,
-            'error': 'Missing resume or job requirements data. Please analyze a resume first.'
-        }
-    chat_prompt = ChatPromptTemplate.from_template("""You are a helpful and friendly career advisor assisting a user in improving their resume for a specific job. You have access to their ACTUAL resume and the job posting.
+chat_prompt = ChatPromptTemplate.from_template("""You are a helpful and friendly career advisor assisting a user in improving their resume for a specific job. You have access to their ACTUAL resume and the job posting.
                                                 
                                                    USER'S RESUME CONTENT: {resume}
                                                    
@@ -124,6 +161,8 @@ def chat_with_ai(resume, user_message, context=None, job_requirements=None):
                                                    USER'S QUESTION: {user_message}
 
                                                    PREVIOUS ANALYSIS: {context}
+
+                                                   CONVERSATION SO FAR: {history}
                                                    
                                                    INSTRUCTIONS: 
                                                         1. You MUST use the resume content above to provide specific advice
@@ -154,12 +193,102 @@ def chat_with_ai(resume, user_message, context=None, job_requirements=None):
                                                    
                                                    CRITICAL: Keep it helpful, human, and to-the-point. You are not a robot. You are a friendly, sharp resume coach.
                                                    """)
+
+def analysis_cache_key(resume_info, job_info):
+    settings = {"model": getattr(llm, "model", type(llm).__name__), "temperature": getattr(llm, "temperature", None)}
+    return analysis_cache.key(ANALYSIS_PROMPT_VERSION, settings, resume_info, job_info)
+
+def cached_analysis(key, use_cache):
+    if not use_cache:
+        cache_requests.inc(cache="analysis", result="bypass")
+        return None
+    output = analysis_cache.get(key)
+    cache_requests.inc(cache="analysis", result="miss" if output is None else "hit")
+    return output
+
+@timed("analyze_resume_and_job")
+def analyze_resume_and_job(resume_info, job_info, use_cache=True, client_id=None):
+    key = analysis_cache_key(resume_info, job_info)
+    output = cached_analysis(key, use_cache)
+    cached = output is not None
+
+    if not cached:
+        chain = analysis_prompt | llm | StrOutputParser()
+        result = RateLimiterRunnable(chain, daily_limit, client_id)
+        input = {"resume_info": resume_info, "job_info": job_info}
+        record_prompt_size("analyze", analysis_prompt, input)
+        output = result.invoke(input=input)
+        analysis_cache.set(key, output)
+    
+    return {
+        'success': True,
+        'analysis': output,
+        'cached': cached,
+        'resume_info': resume_info,
+        'job_info': job_info
+    }
+
+def format_history(history):
+    if not history:
+        return "None"
+    return "\n".join(f"User: {turn['user']}\nAdvisor: {turn['assistant']}" for turn in history)
+
+def relevant_context(resume, job_requirements, user_message):
+    try:
+        return retriever.select_context(resume, job_requirements, user_message)
+    except Exception as e:
+        print(f"Retrieval failed, using full documents: {str(e)}")
+        return resume, job_requirements
+
+@timed("chat_with_ai")
+def chat_with_ai(resume, user_message, context=None, job_requirements=None, history=None, client_id=None):
+    if not resume or not job_requirements:
+        return {
+            'success': False,
+            'error': 'Missing resume or job requirements data. Please analyze a resume first.'
+        }
+    resume, job_requirements = relevant_context(resume, job_requirements, user_message)
     chat_chain = chat_prompt | llm | StrOutputParser()
-    result = RateLimiterRunnable(chat_chain, daily_limit)
-    input = {"resume": resume, "user_message": user_message, "context": context, "job_requirements": job_requirements}
+    result = RateLimiterRunnable(chat_chain, daily_limit, client_id)
+    input = {"resume": resume, "user_message": user_message, "context": context,
+             "job_requirements": job_requirements, "history": format_history(history)}
+    record_prompt_size("chat", chat_prompt, input)
     output = result.invoke(input=input)
     
     return {
         'success': True,
         'response': output
-    }
\ No newline at end of file
+    }
+
+def stream_analysis(resume_info, job_info, use_cache=True, client_id=None):
+    start = time.perf_counter()
+    key = analysis_cache_key(resume_info, job_info)
+    cached = cached_analysis(key, use_cache)
+    if cached is not None:
+        return timed_stream("stream_analysis", iter([cached]), start)
+
+    chain = analysis_prompt | llm | StrOutputParser()
+    result = RateLimiterRunnable(chain, daily_limit, client_id)
+    input = {"resume_info": resume_info, "job_info": job_info}
+    record_prompt_size("analyze", analysis_prompt, input)
+    return timed_stream("stream_analysis", cache_stream(result.stream(input), key), start)
+
+def cache_stream(chunks, key):
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        analysis_cache.set(key, "".join(parts))
+    finally:
+        chunks.close()
+
+def stream_chat(resume, user_message, context=None, job_requirements=None, history=None, client_id=None):
+    start = time.perf_counter()
+    resume, job_requirements = relevant_context(resume, job_requirements, user_message)
+    chat_chain = chat_prompt | llm | StrOutputParser()
+    result = RateLimiterRunnable(chat_chain, daily_limit, client_id)
+    input = {"resume": resume, "user_message": user_message, "context": context,
+             "job_requirements": job_requirements, "history": format_history(history)}
+    record_prompt_size("chat", chat_prompt, input)
+    return timed_stream("stream_chat", result.stream(input), start)
@@ -0,0 +1,150 @@
+from functools import wraps
+import threading
+import bisect
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in sorted(labels.items())) + "}"
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.type = "counter"
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [(self.name + "_total", dict(key), value) for key, value in self.values.items()]
+
+
+class Histogram:
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.type = "histogram"
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[key] = (counts, total + value)
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            series = [(dict(key), list(counts), total) for key, (counts, total) in self.series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", dict(labels, le=bound), cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, cumulative))
+        return samples
+
+
+class Gauge:
+    # Read from a callback at scrape time, e.g. cache sizes kept elsewhere.
+    def __init__(self, name, help, collect):
+        self.name = name
+        self.help = help
+        self.type = "gauge"
+        self.collect = collect
+
+    def samples(self):
+        return [(self.name, labels, value) for labels, value in self.collect()]
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_labels(labels)} {value:g}" if isinstance(value, float)
+                             else f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    "resume_stage_seconds", "Latency of each analyze/chat pipeline stage"))
+prompt_tokens = registry.register(Histogram(
+    "resume_prompt_tokens", "Estimated prompt size sent to the LLM", SIZE_BUCKETS))
+cache_requests = registry.register(Counter(
+    "resume_cache_requests", "Cache lookups by cache and result"))
+rate_limit_wait_seconds = registry.register(Histogram(
+    "resume_rate_limit_wait_seconds", "Time spent waiting for a rate limiter token"))
+rate_limit_rejections = registry.register(Counter(
+    "resume_rate_limit_rejections", "Calls rejected by the rate limiter"))
+first_chunk_seconds = registry.register(Histogram(
+    "resume_first_chunk_seconds", "Time until the first chunk of a streamed response"))
+
+
+def timed(stage):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage_seconds.time(stage=stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed_stream(stage, chunks, start):
+    # Generators return before any work happens, so streamed stages are timed
+    # from `start` to the first chunk and to the end (or client disconnect).
+    try:
+        first = True
+        for chunk in chunks:
+            if first:
+                first_chunk_seconds.observe(time.perf_counter() - start, stage=stage)
+                first = False
+            yield chunk
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage=stage)
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -0,0 +1,161 @@
+from collections import Counter
+from metrics import registry, Gauge
+from bs4 import BeautifulSoup
+import threading
+import json
+import re
+
+# Rough Gemini/GPT-style estimate; good enough for budgeting and reporting.
+CHARS_PER_TOKEN = 4
+
+NON_TEXT_TAGS = ["script", "style", "noscript", "template", "svg", "iframe"]
+NOISE_TAGS = ["nav", "header", "footer", "aside", "form", "button", "select", "dialog"]
+NOISE_ROLES = {"navigation", "banner", "contentinfo", "dialog", "alertdialog", "search"}
+# Matched against whole words of a class or id ("site-footer", "cookie-banner"),
+# never substrings, and not when the name describes a state ("has-sidebar").
+NOISE_WORDS = {"cookie", "cookies", "consent", "gdpr", "newsletter", "subscribe", "social", "share", "sharing",
+               "breadcrumb", "breadcrumbs", "skip", "navbar", "nav", "menu", "footer", "sidebar", "modal",
+               "popup", "advert", "advertisement"}
+STATE_WORDS = {"has", "is", "with", "without", "no", "show", "hide", "open", "opened", "closed", "active",
+               "visible", "hidden", "collapsed", "expanded"}
+NAME_WORDS = re.compile(r"[-_]+")
+BLOCK_TAGS = ["p", "div", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+              "main", "tr", "table", "blockquote", "pre", "dd", "dt"]
+# Shorter lines (titles, dates, single skills) legitimately repeat.
+DEDUPE_MIN_CHARS = 30
+# Less main content than this after stripping means the stripping was wrong.
+MIN_CONTENT_CHARS = 200
+SPACES = re.compile(r"[ \t\r\f\v\u00a0\u200b]+")
+
+token_savings = Counter()
+_savings_lock = threading.Lock()
+registry.register(Gauge("resume_tokens_saved", "Estimated prompt tokens removed by normalization",
+                        lambda: [({"document": kind}, saved) for kind, saved in list(token_savings.items())]))
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def compact(text):
+    lines = (SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def dedupe(lines):
+    seen = set()
+    unique = []
+    for line in lines:
+        key = line.lower()
+        if len(line) < DEDUPE_MIN_CHARS:
+            unique.append(line)
+        elif key not in seen:
+            seen.add(key)
+            unique.append(line)
+    return unique
+
+
+def apply_budget(lines, token_budget):
+    if not token_budget:
+        return lines
+    kept, remaining = [], token_budget * CHARS_PER_TOKEN
+    for line in lines:
+        if len(line) >= remaining:
+            if remaining > 1:
+                kept.append(line[:remaining - 1].rsplit(" ", 1)[0])
+            break
+        kept.append(line)
+        remaining -= len(line) + 1
+    return kept
+
+
+def normalize_document(text, token_budget=None, kind="document", tokens_before=None):
+    lines = apply_budget(dedupe(compact(text)), token_budget)
+    normalized = "\n".join(lines)
+    before = estimate_tokens(text) if tokens_before is None else tokens_before
+    report = {"tokens_before": before, "tokens_after": estimate_tokens(normalized)}
+    report["tokens_saved"] = max(0, report["tokens_before"] - report["tokens_after"])
+    with _savings_lock:
+        token_savings[kind] += report["tokens_saved"]
+    return normalized, report
+
+
+def block_text(element):
+    for br in element.find_all("br"):
+        br.replace_with("\n")
+    for tag in element.find_all(BLOCK_TAGS):
+        tag.insert_after("\n")
+    return element.get_text()
+
+
+def _job_posting_ld(soup):
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            data = data.get("@graph", [data])
+        candidates = data if isinstance(data, list) else []
+        for item in candidates:
+            if isinstance(item, dict) and item.get("@type") == "JobPosting" and item.get("description"):
+                return item
+    return None
+
+
+def _noise_name(name):
+    words = NAME_WORDS.split(name.lower())
+    if len(words) > 3 or STATE_WORDS.intersection(words):
+        return False
+    return words[0] in NOISE_WORDS or words[-1] in NOISE_WORDS
+
+
+def _is_noise(element):
+    if element.attrs is None:
+        return False
+    if element.get("role") in NOISE_ROLES or element.get("aria-hidden") == "true":
+        return True
+    return any(_noise_name(name) for name in [element.get("id") or ""] + (element.get("class") or []) if name)
+
+
+def main_content(html):
+    soup = BeautifulSoup(html, "html.parser")
+    full_text = soup.get_text()
+
+    # Most job boards embed the posting as schema.org JobPosting data, which
+    # is the cleanest source when present.
+    posting = _job_posting_ld(soup)
+    if posting:
+        organization = posting.get("hiringOrganization")
+        header = [posting.get("title") or "", organization.get("name", "") if isinstance(organization, dict) else ""]
+        description = block_text(BeautifulSoup(posting["description"], "html.parser"))
+        return " - ".join(part for part in header if part), description, full_text
+
+    for tag in soup(NON_TEXT_TAGS):
+        tag.decompose()
+    heading = soup.title or soup.find("h1")
+    title = heading.get_text(" ", strip=True) if heading else ""
+    container = soup.find("main") or soup.find(attrs={"role": "main"}) or soup.find("article") or soup.body or soup
+    # The container and everything around it stay, whatever their classes say.
+    keep = {id(container)} | {id(parent) for parent in container.parents}
+    unstripped = block_text(soup.body or soup)
+
+    for element in soup.find_all(lambda tag: tag.name in NOISE_TAGS or _is_noise(tag)):
+        if id(element) not in keep and not element.decomposed:
+            element.decompose()
+
+    content = block_text(container)
+    if len(content.strip()) < MIN_CONTENT_CHARS:
+        content = unstripped
+    return title, content, full_text
+
+
+def normalize_html(html, token_budget=None):
+    # The title leads the normalized text and is also returned in the report,
+    # since pages without one give no header line to recognise it by.
+    title, content, full_text = main_content(html)
+    title = " ".join(title.split())
+    normalized, report = normalize_document(title + "\n" + content, token_budget, kind="job",
+                                            tokens_before=estimate_tokens(full_text))
+    report["title"] = title
+    return normalized, report
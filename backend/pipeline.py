@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from main import extract_resume_info, job_posting
+from resume_parser import serve as serve_resumes
+from fetcher import normalize_url
+from metrics import timed
+from dotenv import load_dotenv
+from functools import partial
+import multiprocessing
+import threading
+import time
+import os
+
+load_dotenv()
+
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "16"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 2)))
+RESUME_TIMEOUT = float(os.getenv("RESUME_TIMEOUT", "20"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "50"))
+# Forking a process that already runs server and worker threads is unsafe;
+# forkserver workers start from a clean interpreter with resume_parser preloaded.
+# Like spawn, they still import the launching script (app.py under
+# `python app.py`), so that import must not start threads or take jobs.
+PARSE_START_METHOD = os.getenv("PARSE_START_METHOD",
+                               "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+# How often a waiting parse checks whether its caller has given up.
+PARSE_POLL_INTERVAL = 0.05
+
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="analyze-io")
+
+
+class StageTimeout(Exception):
+    pass
+
+
+class StageCancelled(Exception):
+    pass
+
+
+class ParseWorkerPool:
+    # Each parse runs in one of a few long-lived processes. When the caller
+    # gives up (timeout, or the other stage failing), that process is killed
+    # and replaced, so a PDF that hangs pypdf cannot hold a slot for good.
+    def __init__(self, workers=2, start_method=PARSE_START_METHOD, target=serve_resumes):
+        self.start_method = start_method
+        self.target = target
+        self.slots = threading.BoundedSemaphore(workers)
+        self.idle = []
+        self.lock = threading.Lock()
+        self.context = None
+
+    def _start_worker(self):
+        with self.lock:
+            if self.context is None:
+                self.context = multiprocessing.get_context(self.start_method)
+                if self.start_method == "forkserver":
+                    self.context.set_forkserver_preload(["resume_parser"])
+        conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=self.target, args=(child_conn,), name="resume-parser", daemon=True)
+        process.start()
+        child_conn.close()
+        return process, conn
+
+    def _take_worker(self):
+        with self.lock:
+            while self.idle:
+                process, conn = self.idle.pop()
+                if process.is_alive():
+                    return process, conn
+                conn.close()
+        return self._start_worker()
+
+    @staticmethod
+    def _kill(worker):
+        process, conn = worker
+        process.kill()
+        process.join()
+        conn.close()
+
+    def parse(self, pdf_bytes, timeout, cancelled=None):
+        deadline = time.monotonic() + timeout
+
+        def check():
+            if cancelled is not None and cancelled.is_set():
+                raise StageCancelled("Resume parsing was cancelled")
+            if time.monotonic() >= deadline:
+                raise StageTimeout(f"Resume parsing timed out after {timeout:g}s")
+
+        while not self.slots.acquire(timeout=PARSE_POLL_INTERVAL):
+            check()
+        worker = None
+        try:
+            worker = self._take_worker()
+            worker[1].send(pdf_bytes)
+            while not worker[1].poll(PARSE_POLL_INTERVAL):
+                check()
+            ok, value = worker[1].recv()
+        except BaseException as e:
+            if worker is not None:
+                self._kill(worker)
+                worker = None
+            if isinstance(e, (EOFError, OSError)):
+                raise RuntimeError("Resume parsing process exited unexpectedly") from e
+            raise
+        finally:
+            if worker is not None:
+                with self.lock:
+                    self.idle.append(worker)
+            self.slots.release()
+        if not ok:
+            raise value
+        return value
+
+
+parse_workers = ParseWorkerPool(PARSE_WORKERS)
+
+
+def parse_in_process(pdf_bytes, cancelled=None):
+    return parse_workers.parse(pdf_bytes, RESUME_TIMEOUT, cancelled)
+
+
+@timed("load_inputs")
+def load_inputs(pdf_bytes, job_link, fetch=None):
+    # Resume parsing (CPU, in a parse process) and the job fetch (network)
+    # run side by side. The first failure or expired stage kills the parse
+    # process; a fetch cannot be interrupted and finishes within its HTTP timeout.
+    cancelled = threading.Event()
+    stages = {
+        fetch_pool.submit(extract_resume_info, pdf_bytes,
+                          parser=partial(parse_in_process, cancelled=cancelled)): ("Resume parsing", RESUME_TIMEOUT),
+        fetch_pool.submit(fetch or job_posting, job_link): ("Job posting fetch", FETCH_TIMEOUT),
+    }
+    resume_future, job_future = stages
+    start = time.monotonic()
+    pending = set(stages)
+
+    try:
+        while pending:
+            deadline = min(start + stages[future][1] for future in pending)
+            done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    raise future.exception()
+            now = time.monotonic()
+            for future in pending:
+                name, timeout = stages[future]
+                if now >= start + timeout:
+                    raise StageTimeout(f"{name} timed out after {timeout:g}s")
+    finally:
+        if pending:
+            cancelled.set()
+        for future in pending:
+            future.cancel()
+
+    return resume_future.result(), job_future.result()
+
+
+def unique_links(job_links):
+    links = {}
+    for link in job_links:
+        link = link.strip()
+        if link:
+            links.setdefault(normalize_url(link), link)
+    return list(links.values())
+
+
+def run_batch(job_links, analyze, max_workers=BATCH_WORKERS):
+    # Yields (link, future) as each job finishes. Closing the generator
+    # (e.g. on client disconnect) cancels the jobs that have not started.
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(job_links))),
+                                  thread_name_prefix="analyze-batch")
+    futures = {executor.submit(analyze, link): link for link in job_links}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
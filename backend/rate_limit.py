@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+import threading
+import sqlite3
+import time
+
+DAY = 24 * 3600
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    # The per-second rate is a token bucket; the daily quotas are call counts
+    # per UTC day, matching a quota that resets at midnight. Both live in
+    # SQLite so every worker process draws from the same budget.
+    def __init__(self, db_path="rate_limit.db", per_second=1.0, burst=5, per_day=100,
+                 per_client_day=25, max_waiters=16, max_wait=10.0):
+        self.db_path = db_path
+        self.bucket = (float(burst), per_second)
+        self.per_day = per_day
+        self.per_client_day = per_client_day
+        self.max_waiters = max_waiters
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.waiters = 0
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS buckets "
+                       "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS daily_counts "
+                       "(name TEXT NOT NULL, day TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (name, day))")
+
+    @contextmanager
+    def _connect(self, write=True):
+        # Reads (health checks, metrics scrapes) use a deferred transaction,
+        # which under WAL never waits for or blocks try_acquire.
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        try:
+            db.execute("BEGIN IMMEDIATE" if write else "BEGIN DEFERRED")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _quotas(self, client_id):
+        quotas = {"global:day": self.per_day}
+        if client_id and self.per_client_day:
+            quotas[f"client:{client_id}:day"] = self.per_client_day
+        return quotas
+
+    def _tokens(self, db, now):
+        capacity, rate = self.bucket
+        row = db.execute("SELECT tokens, updated_at FROM buckets WHERE name = 'global:second'").fetchone()
+        tokens, updated_at = row or (capacity, now)
+        return min(capacity, tokens + (now - updated_at) * rate)
+
+    def _counts(self, db, names, day):
+        names = list(names)
+        rows = db.execute(f"SELECT name, count FROM daily_counts WHERE day = ? AND name IN "
+                          f"({','.join('?' * len(names))})", [day] + names).fetchall()
+        return dict(rows)
+
+    def try_acquire(self, client_id=None):
+        # Takes a token and counts the call against each daily quota, or
+        # returns the seconds to wait.
+        quotas = self._quotas(client_id)
+        now = time.time()
+        day = _utc_day(now)
+        with self._connect() as db:
+            counts = self._counts(db, quotas, day)
+            if any(counts.get(name, 0) >= limit for name, limit in quotas.items()):
+                return DAY - now % DAY
+            tokens = self._tokens(db, now)
+            if tokens < 1:
+                return (1 - tokens) / self.bucket[1] if self.bucket[1] else float("inf")
+            db.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES ('global:second', ?, ?)",
+                       (tokens - 1, now))
+            db.execute("DELETE FROM daily_counts WHERE day < ?", (day,))
+            db.executemany("INSERT INTO daily_counts (name, day, count) VALUES (?, ?, 1) "
+                           "ON CONFLICT (name, day) DO UPDATE SET count = count + 1",
+                           [(name, day) for name in quotas])
+            return 0.0
+
+    def acquire(self, client_id=None, max_wait=None):
+        max_wait = self.max_wait if max_wait is None else max_wait
+        wait = self.try_acquire(client_id)
+        if not wait:
+            return
+
+        with self.lock:
+            if self.waiters >= self.max_waiters:
+                raise RateLimitExceeded("Too many requests are waiting, please try again shortly", wait)
+            self.waiters += 1
+        try:
+            deadline = time.monotonic() + max_wait
+            while wait:
+                if time.monotonic() + wait > deadline:
+                    raise RateLimitExceeded("Rate limit reached, please try again later", wait)
+                time.sleep(wait)
+                wait = self.try_acquire(client_id)
+        finally:
+            with self.lock:
+                self.waiters -= 1
+
+    def utilization(self):
+        now = time.time()
+        quotas = self._quotas(None)
+        with self._connect(write=False) as db:
+            tokens = self._tokens(db, now)
+            counts = self._counts(db, quotas, _utc_day(now))
+        capacity = self.bucket[0]
+        usage = {"global:second": {"capacity": capacity, "available": round(tokens, 3),
+                                   "used": round(1 - tokens / capacity, 3) if capacity else 1.0}}
+        for name, limit in quotas.items():
+            used = counts.get(name, 0)
+            usage[name] = {"capacity": limit, "available": max(0, limit - used),
+                           "used": round(used / limit, 3) if limit else 1.0, "resets_in": round(DAY - now % DAY)}
+        with self.lock:
+            usage["waiting"] = self.waiters
+        return usage
+
+
+def _utc_day(now):
+    return time.strftime("%Y-%m-%d", time.gmtime(now))
@@ -0,0 +1,37 @@
+from dotenv import load_dotenv
+from pypdf import PdfReader
+import io
+import os
+
+# Imported by the resume parsing processes, so it must stay free of side
+# effects beyond reading configuration (no LLM clients, caches or databases).
+load_dotenv()
+
+MAX_RESUME_PAGES = int(os.getenv("MAX_RESUME_PAGES", "10"))
+
+
+class ResumeTooLarge(Exception):
+    pass
+
+
+def parse_resume(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    if len(reader.pages) > MAX_RESUME_PAGES:
+        raise ResumeTooLarge(f"Resume exceeds {MAX_RESUME_PAGES} page limit")
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+def serve(conn):
+    # Worker loop for pipeline.ParseWorkerPool: one resume in, (ok, result) out.
+    while True:
+        try:
+            pdf_bytes = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, parse_resume(pdf_bytes)))
+        except ResumeTooLarge as e:
+            conn.send((False, e))
+        except Exception as e:
+            # pypdf's exceptions do not all survive pickling.
+            conn.send((False, ValueError(str(e))))
@@ -0,0 +1,121 @@
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from metrics import cache_requests
+from cache import LRUCache
+import numpy as np
+import hashlib
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class HashingEmbedder(Embeddings):
+    # Deterministic, offline embedder: signed feature hashing of unigrams and
+    # bigrams. Used for tests and when no embedding API is configured.
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+
+    def _embed(self, text):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vector[h % self.dimensions] += 1.0 if h >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class CachedEmbedder(Embeddings):
+    def __init__(self, embedder, max_entries=10000):
+        self.embedder = embedder
+        self.namespace = getattr(embedder, "model", type(embedder).__name__)
+        self.cache = LRUCache(max_entries)
+
+    def embed_documents(self, texts):
+        keys = [content_hash(self.namespace, text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        cache_requests.inc(len(texts) - len(missing), cache="embedding", result="hit")
+        cache_requests.inc(len(missing), cache="embedding", result="miss")
+        if missing:
+            fresh = self.embedder.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+                self.cache.set(keys[i], vector)
+        return vectors
+
+    def embed_query(self, text):
+        return self.embedder.embed_query(text)
+
+
+class VectorIndex:
+    def __init__(self, chunks, vectors):
+        self.chunks = chunks
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(chunks), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-12)
+
+    def search(self, query_vector, k):
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.matrix @ query
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top])].tolist()
+
+
+class Retriever:
+    def __init__(self, embedder, top_k=4, chunk_size=600, chunk_overlap=100, max_indexes=256):
+        self.embedder = embedder
+        self.top_k = top_k
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.indexes = LRUCache(max_indexes)
+
+    def index(self, text):
+        key = content_hash(text)
+        index = self.indexes.get(key)
+        if index is None:
+            chunks = self.splitter.split_text(text)
+            if len(chunks) > self.top_k:
+                index = VectorIndex(chunks, self.embedder.embed_documents(chunks))
+            else:
+                index = chunks
+            self.indexes.set(key, index)
+        return index
+
+    def select(self, text, query_vector):
+        index = self.index(text)
+        if not isinstance(index, VectorIndex):
+            return text
+        top = sorted(index.search(query_vector, self.top_k))
+        return "\n...\n".join(index.chunks[i] for i in top)
+
+    def select_context(self, resume, job, query):
+        # Short documents are passed through whole; longer ones are reduced to
+        # the chunks closest to the user's message, kept in document order.
+        query_vector = None
+        selected = []
+        for text in (resume, job):
+            if not isinstance(self.index(text), VectorIndex):
+                selected.append(text)
+                continue
+            if query_vector is None:
+                query_vector = self.embedder.embed_query(query)
+            selected.append(self.select(text, query_vector))
+        return selected
@@ -0,0 +1,196 @@
+from collections import Counter
+import numpy as np
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+# Phrases never span these: line breaks, list and clause punctuation, and
+# separators like " - " in "Engineer - Acme". Dots inside node.js are kept.
+PHRASE_BREAK = re.compile(r"[\n\r,;:!?()\[\]|\u00b7\u2022\u2013\u2014]+|\.(?=\s|$)|\s[-/&+]\s")
+
+STOPWORDS = set("""
+a about above across after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had has have
+having he her here hers him his how i if in into is it its itself just let like may me might more most
+must my no nor not now of off on once only or other our ours out over own per same she should so some
+such than that the their them then there these they this those through to too under until up upon us
+very via was we were what when where which while who whom why will with within without would you your
+ability able apply applicant applicants candidate candidates company role position job team teams work
+working works experience experienced years year strong excellent good great preferred required
+requirements responsibilities qualifications plus including include includes new well using use help
+ensure across join opportunity opportunities benefits employee employees equal employer status
+environment skills skill knowledge understanding demonstrated proven related relevant etc e.g i.e
+looking seeking hiring build building tools end day bonus ideally familiarity comfort professional
+""".split())
+
+# Terms that get extra weight when they appear in a posting.
+SKILLS = set("""
+python java javascript typescript c c++ c# go golang rust ruby php scala kotlin swift r matlab sql nosql
+html css react angular vue node node.js django flask fastapi spring rails .net graphql rest api apis
+aws azure gcp docker kubernetes terraform ansible linux git ci/cd jenkins kafka spark hadoop airflow
+postgresql mysql mongodb redis elasticsearch snowflake tableau excel powerpoint salesforce sap jira
+pandas numpy pytorch tensorflow scikit-learn llm nlp ml ai statistics analytics figma agile scrum
+microservices security networking devops testing qa automation embedded firmware cad solidworks
+accounting finance marketing seo sales crm leadership communication negotiation
+""".split()) | {"machine learning", "data analysis", "data science", "deep learning", "project management",
+                "product management", "computer science", "distributed systems", "unit testing",
+                "cloud computing", "data engineering", "customer service", "financial modeling"}
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def phrase_terms(text):
+    terms = []
+    for part in PHRASE_BREAK.split(text.lower()):
+        tokens = tokenize(part)
+        terms.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:])
+                     if a not in STOPWORDS and b not in STOPWORDS and not (a.isdigit() or b.isdigit()))
+        terms.extend(token for token in tokens
+                     if token not in STOPWORDS and not token.isdigit() and (len(token) > 1 or token in SKILLS))
+    return terms
+
+
+def extract_terms(job_text, max_terms=40, title=""):
+    counts = Counter(phrase_terms(job_text))
+    # The job title and company name ("Backend Engineer - Acme") repeat
+    # throughout a posting but are not requirements.
+    for term in set(phrase_terms(title)) - SKILLS:
+        del counts[term]
+
+    weighted = {}
+    for term, count in counts.items():
+        if term in SKILLS:
+            weighted[term] = (1 + math.log(count)) * 2
+        elif count > 1:
+            # Phrases and words the posting repeats are likely requirements.
+            weighted[term] = 1 + math.log(count)
+
+    # Drop words that only ever appear inside a kept phrase ("learning" in
+    # "machine learning") so the same requirement isn't counted twice.
+    for term in [term for term in weighted if " " not in term and term not in SKILLS]:
+        phrases = [phrase for phrase in weighted if " " in phrase and term in phrase.split(" ")]
+        if sum(counts[phrase] for phrase in phrases) >= counts[term]:
+            del weighted[term]
+    ranked = sorted(weighted.items(), key=lambda item: (-item[1], item[0]))[:max_terms]
+    return dict(ranked)
+
+
+class ResumeCorpus:
+    # Resumes tokenized once into flat token-id arrays, cut into fixed-size
+    # chunks. Scoring a posting against the corpus is then pure NumPy.
+    def __init__(self, resume_texts, chunk_size=80):
+        self.vocab = {}
+        token_ids, token_chunks, chunk_lengths, resume_starts = [], [], [], []
+        for text in resume_texts:
+            ids = [self.vocab.setdefault(token, len(self.vocab)) for token in tokenize(text)]
+            first_chunk = len(chunk_lengths)
+            resume_starts.append(first_chunk)
+            chunks = max(1, -(-len(ids) // chunk_size))
+            chunk_lengths.extend(min(chunk_size, len(ids) - i * chunk_size) for i in range(chunks))
+            token_ids.extend(ids)
+            token_chunks.extend(first_chunk + i // chunk_size for i in range(len(ids)))
+
+        self.size = len(resume_texts)
+        self.tokens = np.array(token_ids, dtype=np.int64)
+        self.token_chunks = np.array(token_chunks, dtype=np.int64)
+        self.chunk_lengths = np.array(chunk_lengths, dtype=np.float64)
+        self.resume_starts = np.array(resume_starts, dtype=np.int64)
+        # Bigram codes; pairs that cross a chunk boundary never match.
+        same_chunk = self.token_chunks[1:] == self.token_chunks[:-1]
+        self.pairs = np.where(same_chunk, self.tokens[:-1] * len(self.vocab) + self.tokens[1:], -1)
+
+    def term_frequencies(self, terms):
+        unigrams = np.full(len(self.vocab) + 1, -1, dtype=np.int64)
+        bigram_codes, bigram_terms = [], []
+        for index, term in enumerate(terms):
+            words = term.split(" ")
+            if any(word not in self.vocab for word in words):
+                continue
+            if len(words) == 1:
+                unigrams[self.vocab[term]] = index
+            else:
+                bigram_codes.append(self.vocab[words[0]] * len(self.vocab) + self.vocab[words[1]])
+                bigram_terms.append(index)
+
+        hit_terms = unigrams[self.tokens]
+        hits = [(self.token_chunks[hit_terms >= 0], hit_terms[hit_terms >= 0])]
+        if bigram_codes:
+            order = np.argsort(bigram_codes)
+            codes = np.array(bigram_codes, dtype=np.int64)[order]
+            positions = np.minimum(np.searchsorted(codes, self.pairs), len(codes) - 1)
+            found = codes[positions] == self.pairs
+            hits.append((self.token_chunks[:-1][found], np.array(bigram_terms)[order][positions[found]]))
+
+        chunks = np.concatenate([chunk for chunk, _ in hits])
+        term_ids = np.concatenate([term for _, term in hits])
+        counts = np.bincount(chunks * len(terms) + term_ids, minlength=len(self.chunk_lengths) * len(terms))
+        return counts.reshape(len(self.chunk_lengths), len(terms)).astype(np.float64)
+
+
+class JobProfile:
+    def __init__(self, job_text, max_terms=40, title=""):
+        self.weights_by_term = extract_terms(job_text, max_terms, title)
+        self.terms = list(self.weights_by_term)
+        self.index = {term: i for i, term in enumerate(self.terms)}
+        self.weights = np.array([self.weights_by_term[term] for term in self.terms], dtype=np.float64)
+
+    def score(self, corpus, idf=False):
+        # Chunks are the BM25 documents; a term's strength in a resume is the
+        # saturated tf of its best chunk. With idf, terms that most resumes in
+        # the corpus share count for less, which only makes sense in bulk.
+        if not self.terms or not corpus.size:
+            return np.zeros(corpus.size), np.zeros((corpus.size, len(self.terms)))
+
+        tf = corpus.term_frequencies(self.terms)
+        lengths = corpus.chunk_lengths
+        norm = K1 * (1 - B + B * lengths / max(lengths.mean(), 1.0))
+        saturation = tf / (tf + norm[:, None])
+
+        strength = np.maximum.reduceat(saturation, corpus.resume_starts, axis=0)
+        # Any mention counts for most of a term's weight; repetition adds the rest.
+        coverage = np.where(strength > 0, 0.7 + 0.3 * strength, 0.0)
+        weights = self.weights
+        if idf:
+            matches = (strength > 0).sum(axis=0)
+            weights = weights * np.log(1 + (corpus.size - matches + 0.5) / (matches + 0.5))
+        scores = 100 * coverage @ weights / weights.sum()
+        return scores, strength
+
+    def details(self, score, strength, limit=15):
+        matched = [term for term in self.terms if strength[self.index[term]] > 0]
+        missing = [term for term in self.terms if strength[self.index[term]] == 0]
+        return {"score": int(round(score)), "matched": matched[:limit], "missing": missing[:limit]}
+
+
+def score_resume(resume_text, job_text, title=""):
+    profile = JobProfile(job_text, title=title)
+    scores, strength = profile.score(ResumeCorpus([resume_text]))
+    return profile.details(scores[0], strength[0])
+
+
+def score_resumes(resumes, job_text, details=False, idf=True, title=""):
+    # Accepts raw texts or a prebuilt ResumeCorpus, which lets one corpus be
+    # scored against many postings without re-tokenizing. Scores are relative
+    # to the corpus when idf is on.
+    corpus = resumes if isinstance(resumes, ResumeCorpus) else ResumeCorpus(resumes)
+    profile = JobProfile(job_text, title=title)
+    scores, strength = profile.score(corpus, idf=idf and corpus.size > 1)
+    if not details:
+        return np.rint(scores).astype(int).tolist()
+    return [profile.details(score, row) for score, row in zip(scores, strength)]
+
+
+def rank_jobs(resume_text, job_texts, titles=None):
+    corpus = ResumeCorpus([resume_text])
+    results = []
+    for job_text, title in zip(job_texts, titles or [""] * len(job_texts)):
+        profile = JobProfile(job_text, title=title)
+        scores, strength = profile.score(corpus)
+        results.append(profile.details(scores[0], strength[0]))
+    order = sorted(range(len(results)), key=lambda i: -results[i]["score"])
+    return [(i, results[i]) for i in order]
@@ -0,0 +1,149 @@
+from dotenv import load_dotenv
+from contextlib import contextmanager
+from cache import LRUCache
+import threading
+import secrets
+import sqlite3
+import json
+import time
+import os
+
+load_dotenv()
+
+MAX_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "10"))
+
+
+class MemorySessionBackend:
+    def __init__(self, max_sessions=1000):
+        self.sessions = LRUCache(max_sessions)
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def put(self, session_id, session):
+        self.sessions.set(session_id, session)
+
+    def delete(self, session_id):
+        self.sessions.pop(session_id)
+
+    def modify(self, session_id, change):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            session = change(session) if session is not None else None
+            if session is not None:
+                self.sessions.set(session_id, session)
+            return session
+
+    def purge(self, expired_before):
+        with self.sessions.lock:
+            expired = [key for key, session in self.sessions.entries.items()
+                       if session["updated_at"] < expired_before]
+            for key in expired:
+                del self.sessions.entries[key]
+
+
+class SQLiteSessionBackend:
+    def __init__(self, path="sessions.db", max_sessions=1000):
+        self.path = path
+        self.max_sessions = max_sessions
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                       "(id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        try:
+            with db:
+                if immediate:
+                    db.execute("BEGIN IMMEDIATE")
+                yield db
+        finally:
+            db.close()
+
+    def get(self, session_id):
+        with self._connect() as db:
+            row = db.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id, session):
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO sessions (id, data, updated_at) VALUES (?, ?, ?)",
+                       (session_id, json.dumps(session), session["updated_at"]))
+            db.execute("DELETE FROM sessions WHERE id IN (SELECT id FROM sessions "
+                       "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)", (self.max_sessions,))
+
+    def delete(self, session_id):
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def modify(self, session_id, change):
+        # Read and write under one write lock, so turns sent to other worker
+        # processes at the same time are not lost.
+        with self._connect(immediate=True) as db:
+            row = db.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            session = change(json.loads(row[0])) if row else None
+            if session is not None:
+                db.execute("UPDATE sessions SET data = ?, updated_at = ? WHERE id = ?",
+                           (json.dumps(session), session["updated_at"], session_id))
+        return session
+
+    def purge(self, expired_before):
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions WHERE updated_at < ?", (expired_before,))
+
+
+class SessionStore:
+    def __init__(self, backend, ttl=3600):
+        self.backend = backend
+        self.ttl = ttl
+
+    def create(self, resume_info, job_info, analysis=None):
+        session_id = secrets.token_urlsafe(16)
+        self.backend.purge(time.time() - self.ttl)
+        self.backend.put(session_id, {
+            "resume_info": resume_info,
+            "job_info": job_info,
+            "analysis": analysis,
+            "history": [],
+            "updated_at": time.time(),
+        })
+        return session_id
+
+    def get(self, session_id):
+        session = self.backend.get(session_id) if session_id else None
+        if session is None:
+            return None
+        if time.time() - session["updated_at"] > self.ttl:
+            self.backend.delete(session_id)
+            return None
+        return session
+
+    def update(self, session_id, analysis=None, turn=None):
+        def change(session):
+            if time.time() - session["updated_at"] > self.ttl:
+                return None
+            session = dict(session, updated_at=time.time())
+            if analysis is not None:
+                session["analysis"] = analysis
+            if turn is not None:
+                session["history"] = (session["history"] + [turn])[-MAX_HISTORY_TURNS:]
+            return session
+
+        if session_id:
+            self.backend.modify(session_id, change)
+
+
+def create_session_store():
+    max_sessions = int(os.getenv("SESSION_MAX", "1000"))
+    if os.getenv("SESSION_BACKEND", "memory") == "sqlite":
+        backend = SQLiteSessionBackend(os.getenv("SESSION_DB", "sessions.db"), max_sessions)
+    else:
+        backend = MemorySessionBackend(max_sessions)
+    return SessionStore(backend, ttl=int(os.getenv("SESSION_TTL", "3600")))
+
+
+session_store = create_session_store()
@@ -0,0 +1,21 @@
+import tempfile
+import sys
+import os
+
+# Backend modules import each other by bare name (from cache import LRUCache).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep tests that import the app offline and out of the working directory;
+# load_dotenv does not override variables that are already set.
+_tmp = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.update({
+    "GOOGLE_API_KEY": "test",
+    "LANGSMITH_API_KEY": "",
+    "EMBEDDING_PROVIDER": "local",
+    "LLM_CACHE_DB": "",
+    "SESSION_BACKEND": "memory",
+    "JOB_CACHE_DIR": "",
+    "ANALYSIS_WORKERS": "0",
+    "RATE_LIMIT_DB": os.path.join(_tmp, "rate_limit.db"),
+    "JOB_DB": os.path.join(_tmp, "jobs.db"),
+})
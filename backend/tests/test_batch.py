@@ -0,0 +1,59 @@
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+import threading
+import json
+import io
+import os
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from benchmark import render_pdf, QuietHandler, BENCH_DIR
+from rate_limit import TokenBucketLimiter
+from pipeline import ParseWorkerPool
+
+
+@pytest.fixture
+def postings():
+    handler = partial(QuietHandler, directory=os.path.join(BENCH_DIR, "postings"))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import main
+    import pipeline
+    import app
+    prompts = []
+
+    def respond(prompt):
+        prompts.append(prompt)
+        return AIMessage(content="**Match score: 70/100**")
+
+    monkeypatch.setattr(main, "llm", RunnableLambda(respond))
+    monkeypatch.setattr(main, "daily_limit", TokenBucketLimiter(str(tmp_path / "rate_limit.db"), per_second=1000.0,
+                                                                burst=1000, per_day=1000, per_client_day=0))
+    monkeypatch.setattr(pipeline, "parse_workers", ParseWorkerPool(1, start_method="fork"))
+    test_client = app.app.test_client()
+    test_client.prompts = prompts
+    return test_client
+
+
+def test_batch_collapses_duplicates_and_reports_failures_inline(client, postings):
+    posting = postings + sorted(os.listdir(os.path.join(BENCH_DIR, "postings")))[0]
+    links = [posting, posting + "?utm_source=newsletter", "http://127.0.0.1:1/missing-job"]
+    resume = render_pdf(["Jane Doe", "Python developer with Django and PostgreSQL"])
+
+    response = client.post("/api/analyze/batch", content_type="multipart/form-data", data={
+        "resume": (io.BytesIO(resume), "resume.pdf"), "job_links": "\n".join(links), "no_cache": "true"})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.status_code == 200
+    results = {line["job_link"]: line for line in lines[:-1]}
+    assert set(results) == {posting, "http://127.0.0.1:1/missing-job"}
+    assert results[posting]["status"] == "success" and results[posting]["session_id"]
+    assert results["http://127.0.0.1:1/missing-job"]["status"] == "error"
+    assert lines[-1] == {"status": "done", "succeeded": 1, "failed": 1}
+    assert len(client.prompts) == 1
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+import os
+import pytest
+from fetcher import JobPostingFetcher, DiskCache, normalize_url
+
+PAGE = "<html><body><main>Backend Engineer</main></body></html>"
+
+
+class PostingHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        time.sleep(0.2)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE.encode()
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    PostingHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PostingHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_normalize_url_drops_tracking_params():
+    assert (normalize_url("HTTPS://Jobs.Example.com:443/a?utm_source=x&b=2&a=1&gclid=y")
+            == "https://jobs.example.com/a?a=1&b=2")
+
+
+def test_concurrent_fetches_share_one_request(server):
+    fetcher = JobPostingFetcher(ttl=60)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pages = list(pool.map(fetcher.fetch, [f"{server}/job?utm_source={i}" for i in range(8)]))
+
+    assert pages == [PAGE] * 8
+    assert len(PostingHandler.requests) == 1
+
+
+def test_fresh_entry_is_served_from_cache(server):
+    fetcher = JobPostingFetcher(ttl=60)
+    fetcher.fetch(f"{server}/job")
+    fetcher.fetch(f"{server}/job")
+
+    assert len(PostingHandler.requests) == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(server):
+    fetcher = JobPostingFetcher(ttl=0)
+    assert fetcher.fetch(f"{server}/job") == PAGE
+    assert fetcher.fetch(f"{server}/job") == PAGE
+
+    assert PostingHandler.requests == [("/job", None), ("/job", '"v1"')]
+
+
+def test_failed_fetch_is_raised_to_every_waiter(server):
+    fetcher = JobPostingFetcher(ttl=60)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(fetcher.fetch, "http://127.0.0.1:1/job") for _ in range(4)]
+    for future in futures:
+        with pytest.raises(Exception):
+            future.result()
+
+
+def test_request_goes_to_the_link_as_given(server):
+    fetcher = JobPostingFetcher(ttl=60)
+    fetcher.fetch(f"{server}/job?jobid&b=2&a=1")
+
+    assert PostingHandler.requests == [("/job?jobid&b=2&a=1", None)]
+
+
+def test_disk_entries_past_max_age_are_skipped_and_pruned(tmp_path):
+    cache = DiskCache(str(tmp_path), max_age=60)
+    cache.set("https://a.example/job", {"text": "old"})
+    cache.set("https://b.example/job", {"text": "new"})
+    old = time.time() - 120
+    os.utime(cache._path("https://a.example/job"), (old, old))
+
+    assert cache.get("https://a.example/job") is None
+    assert cache.get("https://b.example/job") == {"text": "new"}
+    cache.prune()
+    assert os.listdir(tmp_path) == [os.path.basename(cache._path("https://b.example/job"))]
@@ -0,0 +1,118 @@
+import threading
+import sqlite3
+import time
+import requests
+from jobs import JobStore, JobWorkerPool
+
+
+def wait_for(store, job_id, statuses=("done", "failed"), timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def test_jobs_are_claimed_by_priority_then_age(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    for name, priority in [("low", -1), ("first", 0), ("high", 5), ("second", 0)]:
+        store.enqueue({"name": name}, priority=priority)
+
+    assert [store.claim()["payload"]["name"] for _ in range(4)] == ["high", "first", "second", "low"]
+    assert store.claim() is None
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), lease=-1)
+    job_id = store.enqueue({}, data=b"resume")
+    store.claim()
+
+    job = store.claim()
+    assert job["id"] == job_id and job["attempts"] == 2 and job["data"] == b"resume"
+
+
+def test_transient_errors_are_retried(tmp_path, monkeypatch):
+    import jobs
+    monkeypatch.setattr(jobs, "JOB_RETRY_DELAY", 0)
+    calls = []
+
+    def handler(job):
+        calls.append(job["attempts"])
+        if len(calls) == 1:
+            raise requests.ConnectionError("reset")
+        return {"message": "ok"}
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    pool = JobWorkerPool(store, handler, workers=1, poll_interval=0.01)
+    pool.start()
+    try:
+        job = wait_for(store, store.enqueue({}))
+    finally:
+        pool.stop()
+    assert job["status"] == "done" and job["result"] == {"message": "ok"} and calls == [1, 2]
+
+
+def test_permanent_errors_fail_immediately(tmp_path):
+    def handler(job):
+        raise ValueError("bad resume")
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+    pool = JobWorkerPool(store, handler, workers=1, poll_interval=0.01)
+    pool.start()
+    try:
+        job = wait_for(store, store.enqueue({}))
+    finally:
+        pool.stop()
+    assert job["status"] == "failed" and job["attempts"] == 1 and job["error"] == "bad resume"
+
+
+def test_worker_survives_database_errors_when_finishing(tmp_path):
+    class FlakyStore(JobStore):
+        failures = 1
+
+        def complete(self, job_id, result):
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            super().complete(job_id, result)
+
+    store = FlakyStore(str(tmp_path / "jobs.db"))
+    pool = JobWorkerPool(store, lambda job: {"message": "ok"}, workers=1, poll_interval=0.01)
+    pool.start()
+    try:
+        store.enqueue({})
+        second = store.enqueue({})
+        assert wait_for(store, second)["status"] == "done"
+        assert all(thread.is_alive() for thread in pool.threads)
+    finally:
+        pool.stop()
+
+
+def test_reads_do_not_wait_for_the_write_lock(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.enqueue({})
+    writer = sqlite3.connect(store.path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    results = []
+    reader = threading.Thread(target=lambda: results.append((store.get(job_id)["status"], store.counts())))
+    reader.start()
+    reader.join(timeout=2)
+    writer.execute("ROLLBACK")
+    writer.close()
+
+    assert results == [("queued", {"queued": 1})]
+
+
+def test_repeated_start_does_not_add_workers(tmp_path):
+    pool = JobWorkerPool(JobStore(str(tmp_path / "jobs.db")), lambda job: {}, workers=2, poll_interval=0.01)
+    starters = [threading.Thread(target=pool.start) for _ in range(8)]
+    for thread in starters:
+        thread.start()
+    for thread in starters:
+        thread.join()
+    try:
+        assert [thread.name for thread in pool.threads] == ["analysis-worker-0", "analysis-worker-1"]
+    finally:
+        pool.stop()
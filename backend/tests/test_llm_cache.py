@@ -0,0 +1,31 @@
+from llm_cache import ResponseCache
+import llm_cache
+
+
+def test_key_ignores_whitespace_differences():
+    cache = ResponseCache()
+    assert cache.key("1", {}, "Python  developer\n", "job") == cache.key("1", {}, " Python developer", "job")
+    assert cache.key("1", {}, "resume", "job") != cache.key("2", {}, "resume", "job")
+
+
+def test_memory_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(ttl=60)
+    cache.set("key", "analysis")
+    assert cache.get("key") == "analysis"
+
+    now[0] += 61
+    assert cache.get("key") is None
+
+
+def test_sqlite_tier_survives_restart_and_expires(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    path = str(tmp_path / "cache.db")
+    ResponseCache(db_path=path, ttl=60).set("key", "analysis")
+
+    restarted = ResponseCache(db_path=path, ttl=60)
+    assert restarted.get("key") == "analysis"
+    now[0] += 61
+    assert restarted.get("key") is None
@@ -0,0 +1,52 @@
+import time
+from metrics import Counter, Histogram, Registry, timed_stream, stage_seconds, first_chunk_seconds
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.register(Counter("requests", "Requests"))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1)))
+    requests.inc(result="hit")
+    latency.observe(0.5, stage="fetch")
+
+    lines = registry.render().splitlines()
+    assert 'requests_total{result="hit"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1",stage="fetch"} 0' in lines
+    assert 'latency_seconds_bucket{le="+Inf",stage="fetch"} 1' in lines
+    assert 'latency_seconds_count{stage="fetch"} 1' in lines
+
+
+def series(histogram, stage):
+    counts, total = histogram.series.get((("stage", stage),), ([0], 0.0))
+    return sum(counts), total
+
+
+def test_timed_stream_records_first_chunk_and_total():
+    def chunks():
+        time.sleep(0.02)
+        yield "a"
+        time.sleep(0.02)
+        yield "b"
+
+    assert list(timed_stream("test_stream", chunks(), time.perf_counter())) == ["a", "b"]
+    first_count, first_total = series(first_chunk_seconds, "test_stream")
+    count, total = series(stage_seconds, "test_stream")
+    assert first_count == count == 1
+    assert 0.02 <= first_total < total
+
+
+def test_closing_a_timed_stream_closes_upstream():
+    closed = []
+
+    def chunks():
+        try:
+            yield "a"
+            yield "b"
+        finally:
+            closed.append(True)
+
+    stream = timed_stream("test_closed_stream", chunks(), time.perf_counter())
+    next(stream)
+    stream.close()
+    assert closed == [True]
+    assert series(stage_seconds, "test_closed_stream")[0] == 1
@@ -0,0 +1,71 @@
+import json
+import pytest
+from normalize import normalize_html, normalize_document, dedupe, apply_budget, _noise_name, CHARS_PER_TOKEN
+
+REQUIREMENTS = "".join(f"<li>Requirement {i}: production experience with Python, Django and PostgreSQL</li>"
+                       for i in range(5))
+
+
+def page(body, body_attrs="", title="Engineer - Acme"):
+    return (f"<html><head><title>{title}</title><script>var tracking = 1;</script></head>"
+            f"<body {body_attrs}>{body}</body></html>")
+
+
+@pytest.mark.parametrize("name, noise", [
+    ("site-footer", True), ("cookie-banner", True), ("sidebar", True), ("newsletter-signup", True),
+    ("has-sidebar", False), ("content-with-sidebar", False), ("menu-closed", False),
+    ("sharepoint", False), ("menuitem", False), ("job-description", False),
+])
+def test_noise_names_match_whole_words(name, noise):
+    assert _noise_name(name) is noise
+
+
+def test_layout_classes_on_page_containers_keep_the_posting():
+    html = page(f'<nav>Home Jobs</nav><div class="content-with-sidebar"><main class="menu-closed">'
+                f'<h1>Engineer</h1><ul>{REQUIREMENTS}</ul></main><div class="sidebar">Similar jobs</div></div>'
+                f'<footer>Copyright</footer>', 'class="has-sidebar"')
+    text, report = normalize_html(html)
+
+    assert text.splitlines()[:2] == ["Engineer - Acme", "Engineer"] and report["title"] == "Engineer - Acme"
+    assert "Requirement 4: production experience with Python, Django and PostgreSQL" in text
+    assert not {"Home Jobs", "Similar jobs", "Copyright"} & set(text.splitlines())
+    assert "tracking" not in text
+
+
+def test_falls_back_to_unstripped_text_when_stripping_leaves_nothing():
+    html = page(f'<div class="modal"><h2>Engineer</h2><ul>{REQUIREMENTS}</ul></div>')
+    text, report = normalize_html(html)
+
+    assert "Requirement 0: production experience with Python, Django and PostgreSQL" in text
+    assert report["tokens_after"] > 50
+
+
+def test_json_ld_posting_is_preferred():
+    posting = {"@context": "https://schema.org", "@type": "JobPosting", "title": "Data Analyst",
+               "hiringOrganization": {"@type": "Organization", "name": "Contoso"},
+               "description": "<p>Write SQL.</p><ul><li>Tableau</li><li>Excel</li></ul>"}
+    html = page(f'<script type="application/ld+json">{json.dumps({"@graph": [posting]})}</script>'
+                f'<div id="app">Loading...</div>')
+    text, report = normalize_html(html)
+
+    assert text.splitlines() == ["Data Analyst - Contoso", "Write SQL.", "Tableau", "Excel"]
+    assert report["title"] == "Data Analyst - Contoso"
+
+
+def test_long_repeated_lines_are_dropped_short_ones_kept():
+    line = "Build and operate Python services on AWS"
+    assert dedupe([line, "Remote", line.upper(), "Remote"]) == [line, "Remote", "Remote"]
+
+
+def test_budget_truncates_at_a_word_boundary():
+    lines = ["first line", "second line is longer than the rest"]
+    assert apply_budget(lines, 5) == ["first line", "second"]
+    assert apply_budget(["word " * 100], 3) == ["word word"]
+    assert apply_budget(lines, None) == lines
+
+
+def test_normalize_document_reports_savings():
+    text, report = normalize_document("a  b\n\n\n" + "x" * 40 + "\n" + "x" * 40, token_budget=100)
+    assert text == "a b\n" + "x" * 40
+    assert report["tokens_after"] == -(-len(text) // CHARS_PER_TOKEN)
+    assert report["tokens_saved"] == report["tokens_before"] - report["tokens_after"]
@@ -0,0 +1,81 @@
+import threading
+import time
+import pytest
+from benchmark import render_pdf
+from pipeline import ParseWorkerPool, StageTimeout, StageCancelled
+
+
+def hang(conn):
+    conn.recv()
+    time.sleep(3600)
+
+
+class RecordingPool(ParseWorkerPool):
+    def __init__(self):
+        super().__init__(workers=1, start_method="fork", target=hang)
+        self.started = []
+
+    def _start_worker(self):
+        worker = super()._start_worker()
+        self.started.append(worker[0])
+        return worker
+
+
+def test_parses_in_a_reused_worker():
+    pool = ParseWorkerPool(workers=1, start_method="fork")
+    pdf = render_pdf(["Jane Doe", "Python developer"])
+
+    assert "Python developer" in pool.parse(pdf, timeout=10)
+    process = pool.idle[0][0]
+    assert "Jane Doe" in pool.parse(pdf, timeout=10)
+    assert pool.idle[0][0] is process
+
+
+def test_parse_errors_keep_the_worker():
+    pool = ParseWorkerPool(workers=1, start_method="fork")
+
+    with pytest.raises(ValueError):
+        pool.parse(b"not a pdf", timeout=10)
+    assert len(pool.idle) == 1 and pool.idle[0][0].is_alive()
+
+
+def test_timed_out_parse_is_killed_and_frees_its_slot():
+    pool = RecordingPool()
+
+    with pytest.raises(StageTimeout):
+        pool.parse(b"%PDF", timeout=0.2)
+    assert pool.idle == [] and not any(process.is_alive() for process in pool.started)
+    # The only slot is free again, so the next parse starts instead of queueing.
+    started = time.monotonic()
+    with pytest.raises(StageTimeout):
+        pool.parse(b"%PDF", timeout=0.2)
+    assert time.monotonic() - started < 1
+
+
+def test_cancelled_parse_is_killed():
+    pool = RecordingPool()
+    cancelled = threading.Event()
+    threading.Timer(0.1, cancelled.set).start()
+
+    started = time.monotonic()
+    with pytest.raises(StageCancelled):
+        pool.parse(b"%PDF", timeout=30, cancelled=cancelled)
+    assert time.monotonic() - started < 1 and pool.idle == [] and not any(process.is_alive() for process in pool.started)
+
+
+def test_failed_fetch_kills_the_running_parse(monkeypatch):
+    import pipeline
+    pool = RecordingPool()
+    monkeypatch.setattr(pipeline, "parse_workers", pool)
+
+    def failing_fetch(job_link):
+        time.sleep(0.2)
+        raise ValueError("posting not found")
+
+    monkeypatch.setattr(pipeline, "job_posting", failing_fetch)
+    with pytest.raises(ValueError, match="posting not found"):
+        pipeline.load_inputs(b"%PDF hangs the parser", "https://example.com/job")
+    deadline = time.monotonic() + 2
+    while pool.started[0].is_alive() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not pool.started[0].is_alive()
@@ -0,0 +1,106 @@
+import threading
+import sqlite3
+import time
+import pytest
+from rate_limit import TokenBucketLimiter, RateLimitExceeded, DAY
+import rate_limit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0 - 1_700_000_000.0 % DAY]  # UTC midnight
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+def limiter(tmp_path, **kwargs):
+    options = dict(per_second=1000.0, burst=1000, per_day=100, per_client_day=0)
+    options.update(kwargs)
+    return TokenBucketLimiter(str(tmp_path / "rate_limit.db"), **options)
+
+
+def test_daily_quota_is_never_exceeded_within_a_day(tmp_path, clock):
+    bucket = limiter(tmp_path)
+    granted = 0
+    for _ in range(24 * 60):
+        while bucket.try_acquire() == 0:
+            granted += 1
+        clock[0] += 60
+
+    assert granted == 100
+
+
+def test_daily_quota_resets_at_utc_midnight(tmp_path, clock):
+    bucket = limiter(tmp_path, per_day=2)
+    clock[0] += DAY - 3600
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(3600)
+
+    clock[0] += 3600
+    assert bucket.try_acquire() == 0
+
+
+def test_client_quota_is_separate_from_global(tmp_path, clock):
+    bucket = limiter(tmp_path, per_client_day=1)
+    assert bucket.try_acquire("a") == 0
+    assert bucket.try_acquire("a") > 0
+    assert bucket.try_acquire("b") == 0
+    assert bucket.utilization()["global:day"]["available"] == 98
+
+
+def test_per_second_bucket_refills(tmp_path, clock):
+    bucket = limiter(tmp_path, per_second=2.0, burst=1)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert bucket.try_acquire() == 0
+
+
+def test_wait_longer_than_max_wait_is_rejected_with_retry_after(tmp_path):
+    bucket = limiter(tmp_path, per_day=0)
+    with pytest.raises(RateLimitExceeded) as error:
+        bucket.acquire(max_wait=1)
+    assert 0 < error.value.retry_after <= DAY
+
+
+def test_waiting_queue_is_bounded(tmp_path):
+    bucket = limiter(tmp_path, per_second=2.0, burst=1, max_waiters=1)
+    bucket.acquire()
+    waiter = threading.Thread(target=bucket.acquire)
+    waiter.start()
+    while not bucket.waiters:
+        time.sleep(0.01)
+
+    with pytest.raises(RateLimitExceeded, match="waiting"):
+        bucket.acquire()
+    waiter.join()
+    assert bucket.waiters == 0
+
+
+def test_rejected_call_returns_429_with_retry_after(tmp_path, monkeypatch):
+    import main
+    import app
+    from sessions import session_store
+    monkeypatch.setattr(main, "daily_limit", limiter(tmp_path, per_day=0))
+    session_id = session_store.create("Python developer", "Python role", "analysis")
+
+    response = app.app.test_client().post("/api/chat", json={"session_id": session_id, "message": "hi"})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == response.get_json()["retry_after"] > 0
+
+
+def test_utilization_does_not_wait_for_the_write_lock(tmp_path):
+    bucket = limiter(tmp_path)
+    bucket.acquire()
+    writer = sqlite3.connect(bucket.db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    results = []
+    reader = threading.Thread(target=lambda: results.append(bucket.utilization()["global:day"]["available"]))
+    reader.start()
+    reader.join(timeout=2)
+    writer.execute("ROLLBACK")
+    writer.close()
+
+    assert results == [99]
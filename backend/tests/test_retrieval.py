@@ -0,0 +1,56 @@
+import numpy as np
+from retrieval import HashingEmbedder, CachedEmbedder, VectorIndex, Retriever
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def test_search_returns_top_k_in_score_order():
+    index = VectorIndex(["a", "b", "c", "d"], np.eye(4))
+    query = [0.1, 0.9, 0.0, 0.5]
+
+    assert index.search(query, 2) == [1, 3]
+    assert index.search(query, 4) == [1, 3, 0, 2]
+    assert index.search(query, 10) == [1, 3, 0, 2]
+
+
+def test_short_documents_pass_through_unchanged():
+    retriever = Retriever(HashingEmbedder(), top_k=4)
+    resume, job = "Python developer\nFive years of Django.", "Backend Engineer - Acme\nPython, Docker."
+
+    assert retriever.select_context(resume, job, "Which skills should I add?") == [resume, job]
+
+
+def test_long_documents_are_cut_to_matching_chunks_in_order():
+    topics = ["kubernetes clusters", "python services", "sales targets", "kubernetes operators",
+              "office snacks", "marketing budgets", "kubernetes networking", "team lunches"]
+    paragraphs = [f"Paragraph {i} is about {topic}. " * 4 for i, topic in enumerate(topics)]
+    resume = "\n\n".join(paragraphs)
+    retriever = Retriever(HashingEmbedder(), top_k=3, chunk_size=150, chunk_overlap=0)
+
+    selected, job = retriever.select_context(resume, "Short posting", "kubernetes")
+    chunks = selected.split("\n...\n")
+
+    assert job == "Short posting"
+    assert len(chunks) == 3 and all("kubernetes" in chunk for chunk in chunks)
+    assert [resume.index(chunk) for chunk in chunks] == sorted(resume.index(chunk) for chunk in chunks)
+
+
+def test_cached_embedder_embeds_each_chunk_once():
+    inner = CountingEmbedder()
+    embedder = CachedEmbedder(inner)
+    chunks = ["first chunk", "second chunk", "first chunk"]
+
+    first = embedder.embed_documents(chunks)
+    calls = len(inner.embedded)
+    second = embedder.embed_documents(chunks)
+
+    assert len(inner.embedded) == calls
+    assert calls > 0 and second == first
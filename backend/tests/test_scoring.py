@@ -0,0 +1,72 @@
+from scoring import extract_terms, score_resume, score_resumes, rank_jobs, ResumeCorpus
+from normalize import normalize_html
+
+TITLE = "Backend Engineer - Acme"
+JOB = TITLE + """
+Acme is hiring a backend engineer.
+Build Python services on PostgreSQL with machine learning pipelines.
+Requirements: Python, Docker, Kubernetes, machine learning, distributed systems.
+Acme offers great benefits. Acme, Acme, Acme."""
+
+
+def test_title_and_company_are_not_requirements():
+    terms = extract_terms(JOB, title=TITLE)
+    assert "python" in terms and "machine learning" in terms
+    assert not {"acme", "backend engineer", "engineer"} & set(terms)
+
+
+def test_untitled_posting_keeps_its_first_line():
+    html = ("<html><body><main><p>Build Grafana dashboards, observability platforms and alerting.</p>"
+            "<p>You will own Grafana dashboards and observability platforms end to end.</p>"
+            "<p>Details about our office culture.</p></main></body></html>")
+    text, report = normalize_html(html)
+    terms = extract_terms(text, title=report["title"])
+
+    assert report["title"] == ""
+    assert {"grafana dashboards", "observability platforms"} <= set(terms)
+
+
+def test_phrases_do_not_span_punctuation_or_lines():
+    terms = extract_terms("Senior Manager, Growth\nManager\nGrowth and scale")
+    assert "manager growth" not in terms
+    assert {"manager", "growth"} <= set(terms)
+
+
+def test_bigram_matches_only_adjacent_words():
+    job = "machine learning, machine learning, distributed systems, distributed systems"
+    adjacent, apart = score_resumes(["I do machine learning", "machine tools and learning"], job,
+                                    details=True, idf=False)
+    assert "machine learning" in adjacent["matched"]
+    assert "machine learning" in apart["missing"]
+
+
+def test_bigram_does_not_match_across_chunks():
+    corpus = ResumeCorpus(["filler " * 79 + "machine learning"], chunk_size=80)
+    scores = score_resumes(corpus, "machine learning, machine learning", idf=False)
+    assert scores == [0]
+
+
+def test_empty_inputs():
+    assert score_resumes([], JOB) == []
+    assert score_resumes(["", "   "], JOB) == [0, 0]
+    assert score_resume("Python developer", "")["score"] == 0
+    assert score_resume("", JOB) == {"score": 0, "matched": [], "missing": list(extract_terms(JOB))[:15]}
+
+
+def test_bulk_score_matches_single_score_without_idf():
+    resumes = ["Python, Docker and Kubernetes", "Machine learning engineer using Python"]
+    single = [score_resume(text, JOB)["score"] for text in resumes]
+    assert score_resumes(resumes, JOB, idf=False) == single
+
+
+def test_idf_rewards_terms_few_resumes_have():
+    resumes = ["Python Docker", "Python Kubernetes"] + ["Python"] * 8
+    scores = score_resumes(resumes, JOB)
+    assert scores[0] > scores[2] and scores[1] > scores[2]
+    # Every resume has Python, so it barely separates them.
+    assert scores[2] < score_resume("Python", JOB)["score"]
+
+
+def test_rank_jobs_orders_by_score():
+    ranked = rank_jobs("Python Docker Kubernetes", ["Excel, Excel, Tableau", JOB])
+    assert [index for index, _ in ranked] == [1, 0]
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from sessions import SessionStore, SQLiteSessionBackend, MemorySessionBackend
+import sessions
+
+
+def test_memory_session_keeps_recent_history(monkeypatch):
+    monkeypatch.setattr(sessions, "MAX_HISTORY_TURNS", 2)
+    store = SessionStore(MemorySessionBackend())
+    session_id = store.create("resume", "job")
+    for i in range(3):
+        store.update(session_id, turn={"user": str(i), "assistant": "ok"})
+
+    assert [turn["user"] for turn in store.get(session_id)["history"]] == ["1", "2"]
+
+
+def test_expired_session_is_not_updated():
+    store = SessionStore(MemorySessionBackend(), ttl=-1)
+    session_id = store.create("resume", "job")
+    store.update(session_id, analysis="new")
+
+    assert store.get(session_id) is None
+
+
+def test_sqlite_turns_from_separate_workers_are_not_lost(tmp_path):
+    # One store per "worker process", all sharing the same database file.
+    path = str(tmp_path / "sessions.db")
+    stores = [SessionStore(SQLiteSessionBackend(path)) for _ in range(4)]
+    session_id = stores[0].create("resume", "job")
+
+    def chat(i):
+        stores[i % 4].update(session_id, turn={"user": str(i), "assistant": "ok"})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(chat, range(sessions.MAX_HISTORY_TURNS)))
+
+    history = stores[0].get(session_id)["history"]
+    assert sorted(int(turn["user"]) for turn in history) == list(range(sessions.MAX_HISTORY_TURNS))
@@ -0,0 +1,5 @@
+# Production entrypoint, e.g. gunicorn --chdir backend wsgi:app
+from app import app
+from jobs import analysis_workers
+
+analysis_workers.start()
@@ -22,8 +22,7 @@ function App() {
   const [hasAnalyzed, setHasAnalyzed] = useState(false);
   const [recommendations, setRecommendations] = useState<Recommendation[]>([]);
   const [analysisNote, setAnalysisNote] = useState<string>('');
-  const [resumeContent, setResumeContent] = useState<string>('');
-  const [jobContent, setJobContent] = useState<string>('');
+  const [sessionId, setSessionId] = useState<string>('');
 
   const parseAnalysisResult = (aiResponse: string): Recommendation[] => {
     const recommendations: Recommendation[] = [];
@@ -194,11 +193,8 @@ function App() {
           setAnalysisNote('Note: Job posting content couldn\'t be extracted automatically. Analysis based on general resume optimization best practices.');
         }
         
-        if (data.resume_content) {
-          setResumeContent(data.resume_content);
-        }
-        if (data.job_content) {
-          setJobContent(data.job_content);
+        if (data.session_id) {
+          setSessionId(data.session_id);
         }
         
         const parsedRecommendations = parseAnalysisResult(data.message || '');
@@ -238,8 +234,7 @@ function App() {
     setAnalysisNote('');
     setJobLink('');
     setIsAnalyzing(false);
-    setResumeContent('');
-    setJobContent('');
+    setSessionId('');
   };
 
   return (
@@ -347,8 +342,7 @@ function App() {
 
               <div className="mt-16">
                 <ChatInterface 
-                  resumeContent={resumeContent}
-                  jobContent={jobContent}
+                  sessionId={sessionId}
                 />
               </div>
             </div>
@@ -9,11 +9,10 @@ interface Message {
 }
 
 interface ChatInterfaceProps {
-  resumeContent: string;
-  jobContent: string;
+  sessionId: string;
 }
 
-const ChatInterface: React.FC<ChatInterfaceProps> = ({ resumeContent, jobContent }) => {
+const ChatInterface: React.FC<ChatInterfaceProps> = ({ sessionId }) => {
   const [messages, setMessages] = useState<Message[]>([
     {
       id: '1',
@@ -60,8 +59,7 @@ const ChatInterface: React.FC<ChatInterfaceProps> = ({ resumeContent, jobContent
         },
         body: JSON.stringify({ 
           message: inputValue,
-          resume_content: resumeContent,
-          job_content: jobContent
+          session_id: sessionId
         }),
       });
 